@@ -5,12 +5,18 @@ This script generates optimized lineups for College Football standard DFS contes
 
 from typing import List, Dict, Set, Tuple, Optional
 import pandas as pd
+import numpy as np
 from ortools.sat.python import cp_model
 import os
 from dataclasses import dataclass
 from pathlib import Path
 import csv
 
+try:
+    from numba import njit, prange
+except ImportError:  # Numba is optional; metrics fall back to plain NumPy
+    njit = None
+
 # ===== Configuration =====
 class Config:
     # File paths
@@ -61,6 +67,34 @@ class Config:
     EXCLUDED_TEAMS = [
         # Add teams to exclude from stacking here
     ]
+    
+    # Solver settings
+    NUM_SEARCH_WORKERS = os.cpu_count() or 8  # Parallel portfolio search workers
+    LINEARIZATION_LEVEL = 2  # Stronger LP relaxation for the salary/knapsack constraints
+    RELATIVE_GAP_LIMIT = 0.02  # Accept lineups within 2% of the best bound
+    MAX_TIME_PER_LINEUP = 2.0  # Seconds per solve; the best feasible lineup found is kept
+    STOP_AFTER_FIRST_SOLUTION = False  # True favours diversity over peak projection
+    
+    # Tuned CP-SAT parameters (name -> value) applied on top of the settings above.
+    # Fill in from an offline cpsat-autotune run on a model exported via EXPORT_MODEL_PATH.
+    TUNED_SOLVER_PARAMETERS = {}
+    EXPORT_MODEL_PATH = None  # e.g. "lineup.pb" to export the base model for tuning
+
+# Position bit flags for Player.pos_mask
+POS_QB = 1 << 0
+POS_RB = 1 << 1
+POS_WR = 1 << 2
+
+# FanDuel College Football roster order of the slots
+SLOT_ORDER = {"QB": 0, "RB": 1, "WR": 2, "SUPER_FLEX": 3}
+
+# Position flags each roster slot accepts (Super FLEX can only be filled by QBs)
+SLOT_MASKS = {
+    "QB": POS_QB,
+    "RB": POS_RB,
+    "WR": POS_WR,
+    "SUPER_FLEX": POS_QB
+}
 
 @dataclass
 class Player:
@@ -76,26 +110,22 @@ class Player:
 
     def __post_init__(self):
         self.current_projection = self.projection  # Initialize current projection
+        # Ownership as a decimal for the ownership product (ownership is in percentage form)
+        self.ownership_decimal = self.ownership / 100.0 if self.ownership > 0 else 0.01
+        # Name without any "Team:" style prefix, used for exclusions and exposure tracking
+        self.display_name = self.name.split(":")[-1].strip()
+        # Position membership as bit flags so eligibility checks are a single AND
+        self.pos_mask = (
+            (POS_QB if "QB" in self.positions else 0)
+            | (POS_RB if "RB" in self.positions else 0)
+            | (POS_WR if "WR" in self.positions else 0)
+        )
 
 
 
 @dataclass
 class Lineup:
-    players: List[Dict]
-    
-    @property
-    def lineup(self):
-        """Convert our players to the correct FanDuel College Football order."""
-        fd_position_order = ['QB', 'RB', 'RB', 'WR', 'WR', 'WR', 'SUPER_FLEX']
-        # Create a mapping of positions to players
-        position_map = {pos: [] for pos in ['QB', 'RB', 'WR', 'SUPER_FLEX']}
-        for player in self.players:
-            position_map[player["Slot"]].append(player)
-        ordered_players = []
-        for pos in fd_position_order:
-            if position_map[pos]:
-                ordered_players.append(position_map[pos].pop(0))
-        return ordered_players
+    players: List[Dict]  # Stored in FanDuel College Football slot order
 
 def load_and_clean_data(file_path: str) -> pd.DataFrame:
     """Load and clean the player data from CSV file."""
@@ -119,152 +149,184 @@ def load_and_clean_data(file_path: str) -> pd.DataFrame:
 
 def create_player_objects(df: pd.DataFrame) -> List[Player]:
     """Convert DataFrame rows to Player objects."""
-    players = []
-    for _, row in df.iterrows():
-        positions = row["Position"].split("/")
-        name = f"{row['First Name']} {row['Last Name']}"
-        
-        # Filter out players with projection under MIN_PROJECTION
-        projection = round(row["FPPG"], 2)
-        if projection < Config.MIN_PROJECTION:
-            continue
-        
-        # Get ceiling projection (default to 1.5x projection if not available)
-        ceiling = float(row.get("Ceiling", projection * 1.5))
-        
-        players.append(Player(
-            id=row["Id"],
+    # Filter out players with projection under MIN_PROJECTION
+    df = df.assign(FPPG=df["FPPG"].round(2))
+    df = df[df["FPPG"] >= Config.MIN_PROJECTION].copy()
+    
+    df["Name"] = df["First Name"] + " " + df["Last Name"]
+    df["positions"] = df["Position"].str.split("/")
+    
+    # Get ceiling projection (default to 1.5x projection if not available)
+    default_ceiling = df["FPPG"] * 1.5
+    df["Ceiling"] = df["Ceiling"].fillna(default_ceiling) if "Ceiling" in df.columns else default_ceiling
+    
+    ownership = df["Projected Ownership"] if "Projected Ownership" in df.columns else pd.Series(0.0, index=df.index)
+    
+    return [
+        Player(
+            id=player_id,
             name=name,
             positions=positions,
-            team=row["Team"],
-            opponent=row["Opponent"],
-            salary=int(row["Salary"]),
+            team=team,
+            opponent=opponent,
+            salary=int(salary),
             projection=projection,
-            ownership=float(row.get("Projected Ownership", 0)),
-            ceiling=ceiling
-        ))
-    return players
+            ownership=float(own),
+            ceiling=float(ceiling)
+        )
+        for player_id, name, positions, team, opponent, salary, projection, own, ceiling in zip(
+            df["Id"], df["Name"], df["positions"], df["Team"], df["Opponent"],
+            df["Salary"], df["FPPG"], ownership, df["Ceiling"]
+        )
+    ]
 
 def calculate_percentile_thresholds(players: List[Player]) -> Dict[str, float]:
     """Calculate dynamic salary thresholds based on percentiles."""
     thresholds = {}
     
     # Calculate RB salary percentiles
-    rb_salaries = [p.salary for p in players if "RB" in p.positions]
-    if rb_salaries:
-        rb_salaries.sort()
-        premium_index = int(len(rb_salaries) * Config.PREMIUM_RB_PERCENTILE / 100)
-        thresholds['premium_rb'] = rb_salaries[premium_index]
+    rb_salaries = np.fromiter((p.salary for p in players if p.pos_mask & POS_RB), dtype=np.int64)
+    if rb_salaries.size:
+        premium_index = int(rb_salaries.size * Config.PREMIUM_RB_PERCENTILE / 100)
+        thresholds['premium_rb'] = int(np.partition(rb_salaries, premium_index)[premium_index])
     
     # Calculate WR salary percentiles
-    wr_salaries = [p.salary for p in players if "WR" in p.positions]
-    if wr_salaries:
-        wr_salaries.sort()
-        cheap_index = int(len(wr_salaries) * Config.CHEAP_WR_PERCENTILE / 100)
-        thresholds['cheap_wr'] = wr_salaries[cheap_index]
+    wr_salaries = np.fromiter((p.salary for p in players if p.pos_mask & POS_WR), dtype=np.int64)
+    if wr_salaries.size:
+        cheap_index = int(wr_salaries.size * Config.CHEAP_WR_PERCENTILE / 100)
+        thresholds['cheap_wr'] = int(np.partition(wr_salaries, cheap_index)[cheap_index])
     
     return thresholds
 
-def create_lineup_model(players: List[Player], 
-                       teams: List[str],
-                       used_lineups_sets: List[Set[int]],
-                       num_generated_lineups: int) -> Tuple[cp_model.CpModel, Dict]:
-    """Create the constraint programming model for lineup optimization."""
+def build_player_arrays(players: List[Player]) -> Dict[str, np.ndarray]:
+    """Lay out the player attributes used by the model as parallel arrays indexed by player index."""
+    return {
+        "salaries": np.array([p.salary for p in players], dtype=np.int64),
+        "projections": np.array([p.projection for p in players], dtype=np.float64),
+        "is_rb": np.array([p.pos_mask & POS_RB for p in players], dtype=bool),
+        "is_wr": np.array([p.pos_mask & POS_WR for p in players], dtype=bool)
+    }
+
+def group_players(players: List[Player]) -> Dict[str, Dict]:
+    """Group player indices by team and position once so model building only does lookups."""
+    groups = {
+        "players_by_team": {},
+        "qbs_by_team": {},
+        "wrs_by_team": {},
+        "qbs_all": [],
+        "rbs_all": [],
+        "wrs_all": []
+    }
+    for i, p in enumerate(players):
+        groups["players_by_team"].setdefault(p.team, []).append(i)
+        groups["qbs_by_team"].setdefault(p.team, [])
+        groups["wrs_by_team"].setdefault(p.team, [])
+        if p.pos_mask & POS_QB:
+            groups["qbs_by_team"][p.team].append(i)
+            groups["qbs_all"].append(i)
+        if p.pos_mask & POS_RB:
+            groups["rbs_all"].append(i)
+        if p.pos_mask & POS_WR:
+            groups["wrs_by_team"][p.team].append(i)
+            groups["wrs_all"].append(i)
+    return groups
+
+def build_base_model(players: List[Player],
+                     teams: List[str],
+                     groups: Dict[str, Dict],
+                     arrays: Dict[str, np.ndarray],
+                     thresholds: Dict[str, float]) -> Tuple[cp_model.CpModel, Dict]:
+    """Build the lineup model once; uniqueness cuts are added to it as lineups are found."""
     model = cp_model.CpModel()
+    excluded_teams = set(Config.EXCLUDED_TEAMS)
     
-    # Create player variables
-    player_vars = {p.id: model.NewBoolVar(f"player_{p.id}") for p in players}
-    assign = {}
-    
-    # Create assignment variables
+    # Create assignment variables, indexed by player index
+    assign = []
     for p in players:
-        assign[p.id] = {}
+        slots = {}
         for slot in Config.SLOTS:
-            # Super FLEX can only be filled by QBs
-            if slot == "SUPER_FLEX":
-                can_play = "QB" in p.positions
-            else:
-                can_play = slot in p.positions
-            if can_play:
-                assign[p.id][slot] = model.NewBoolVar(f"assign_{p.id}_{slot}")
+            if p.pos_mask & SLOT_MASKS[slot]:
+                slots[slot] = model.NewBoolVar(f"assign_{p.id}_{slot}")
+        assign.append(slots)
     
     # Add roster constraints
     for slot, count in Config.SLOTS.items():
-        model.Add(sum(assign[p.id][slot] for p in players if slot in assign[p.id]) == count)
+        model.Add(sum(slots[slot] for slots in assign if slot in slots) == count)
     
-    for p in players:
-        model.Add(sum(assign[p.id][s] for s in assign[p.id]) <= 1)
-        model.Add(sum(assign[p.id][s] for s in assign[p.id]) == player_vars[p.id])
+    # A player is used when any of their slot assignments is set
+    used = [cp_model.LinearExpr.Sum(list(slots.values())) for slots in assign]
+    for expr in used:
+        model.Add(expr <= 1)
     
-    # Exclude specific players
-    for p in players:
-        if p.name.split(":")[-1].strip() in Config.EXCLUDED_PLAYERS:
-            model.Add(player_vars[p.id] == 0)
-    
-
+    # QBs keep a Boolean so the stacking rules can be enforced on it
+    qb_used = {}
+    for i in groups["qbs_all"]:
+        qb_used[i] = model.NewBoolVar(f"qb_used_{players[i].id}")
+        model.Add(used[i] == qb_used[i])
     
     # Total players constraint
-    model.Add(sum(player_vars[p.id] for p in players) == 7)  # 7 players in CFB lineup
+    model.Add(sum(used) == 7)  # 7 players in CFB lineup
     
     # Salary constraints
-    model.Add(sum(p.salary * player_vars[p.id] for p in players) <= Config.MAX_SALARY)
-    model.Add(sum(p.salary * player_vars[p.id] for p in players) >= Config.MIN_SALARY)
-    
-    # Team constraints (max 4 per team)
-    for team in teams:
-        if team not in Config.EXCLUDED_TEAMS:
-            team_players = [p for p in players if p.team == team]
-            model.Add(sum(player_vars[p.id] for p in team_players) <= Config.MAX_PLAYERS_PER_TEAM)
+    total_salary = sum(salary * expr for salary, expr in zip(arrays["salaries"].tolist(), used))
+    model.Add(total_salary <= Config.MAX_SALARY)
+    model.Add(total_salary >= Config.MIN_SALARY)
     
-    # At least 3 unique teams in the lineup
+    # Per-team constraints, built in a single pass over the teams
     team_used_vars = {}
     for team in teams:
-        team_players = [p for p in players if p.team == team]
+        team_players = groups["players_by_team"][team]
+        
+        # team_used is 1 exactly when any player from this team is used
         team_used = model.NewBoolVar(f"team_used_{team}")
-        # If any player from this team is used, team_used is 1
-        model.AddMaxEquality(team_used, [player_vars[p.id] for p in team_players])
+        team_assign_vars = [var for i in team_players for var in assign[i].values()]
+        model.AddBoolOr(team_assign_vars).OnlyEnforceIf(team_used)
+        for var in team_assign_vars:
+            model.AddImplication(var, team_used)
         team_used_vars[team] = team_used
-    model.Add(sum(team_used_vars[team] for team in teams) >= 3)
+        
+        if team in excluded_teams:
+            continue
+        
+        # Max 4 players per team
+        model.Add(sum(used[i] for i in team_players) <= Config.MAX_PLAYERS_PER_TEAM)
+        
+        # Max 2 WRs per team
+        team_wr_count = sum(used[i] for i in groups["wrs_by_team"][team])
+        model.Add(team_wr_count <= 2)
+        
+        # QB stacking - if a QB is used (in either QB slot or Super FLEX),
+        # ensure 1-2 WRs from the same team are also used
+        for qb in groups["qbs_by_team"][team]:
+            model.Add(team_wr_count >= Config.MIN_QB_WR_STACK).OnlyEnforceIf(qb_used[qb])
+            model.Add(team_wr_count <= Config.MAX_QB_WR_STACK).OnlyEnforceIf(qb_used[qb])
     
-    # QB stacking constraints - ensure each QB is paired with 1-2 WRs from their team
-    for team in teams:
-        if team not in Config.EXCLUDED_TEAMS:
-            team_qbs = [p for p in players if p.team == team and "QB" in p.positions]
-            team_wrs = [p for p in players if p.team == team and "WR" in p.positions]
-            
-            # For each QB on this team, ensure they stack with 1-2 WRs from same team
-            for qb in team_qbs:
-                # Count how many WRs from same team are used with this QB
-                qb_wr_stack_count = sum(player_vars[wr.id] for wr in team_wrs)
-                
-                # If this QB is used (in either QB slot or Super FLEX), ensure 1-2 WRs from same team are also used
-                model.Add(qb_wr_stack_count >= Config.MIN_QB_WR_STACK).OnlyEnforceIf(player_vars[qb.id])
-                model.Add(qb_wr_stack_count <= Config.MAX_QB_WR_STACK).OnlyEnforceIf(player_vars[qb.id])
+    # At least 3 unique teams in the lineup
+    model.Add(sum(team_used_vars.values()) >= 3)
     
     # Ensure we have exactly 2 QBs total (1 in QB slot + 1 in Super FLEX)
-    qb_players = [p for p in players if "QB" in p.positions]
-    total_qbs = sum(player_vars[p.id] for p in qb_players)
+    total_qbs = sum(qb_used.values())
     model.Add(total_qbs == 2)
     
-    # Max 2 WRs per team constraint
-    for team in teams:
-        if team not in Config.EXCLUDED_TEAMS:
-            team_wrs = [p for p in players if p.team == team and "WR" in p.positions]
-            team_wr_count = sum(player_vars[p.id] for p in team_wrs)
-            model.Add(team_wr_count <= 2)
+    # Symmetry breaking: the two QBs can swap between the QB and Super FLEX slots,
+    # so fix the canonical order (lower player index always takes the QB slot).
+    # SUPER_FLEX only accepts QBs, so one linear constraint covers every pair
+    qbs_all = groups["qbs_all"]
+    model.Add(
+        sum(i * assign[i]["QB"] for i in qbs_all)
+        <= sum(i * assign[i]["SUPER_FLEX"] for i in qbs_all)
+    )
     
     # Stars-and-scrubs constraints
     if Config.ENABLE_STARS_AND_SCRUBS:
-        # Calculate dynamic thresholds based on percentiles
-        thresholds = calculate_percentile_thresholds(players)
-        
         # Define premium RBs and cheap WRs using dynamic thresholds
-        premium_rbs = [p for p in players if "RB" in p.positions and p.salary >= thresholds.get('premium_rb', 0)]
-        cheap_wrs = [p for p in players if "WR" in p.positions and p.salary <= thresholds.get('cheap_wr', float('inf'))]
+        salaries = arrays["salaries"]
+        premium_rbs = np.flatnonzero(arrays["is_rb"] & (salaries >= thresholds.get('premium_rb', 0)))
+        cheap_wrs = np.flatnonzero(arrays["is_wr"] & (salaries <= thresholds.get('cheap_wr', float('inf'))))
         
         # Count premium RBs and cheap WRs in lineup
-        premium_rb_count = sum(player_vars[p.id] for p in premium_rbs)
-        cheap_wr_count = sum(player_vars[p.id] for p in cheap_wrs)
+        premium_rb_count = sum(used[i] for i in premium_rbs.tolist())
+        cheap_wr_count = sum(used[i] for i in cheap_wrs.tolist())
         
         # Ensure minimum and maximum premium RBs
         model.Add(premium_rb_count >= Config.MIN_PREMIUM_RB_COUNT)
@@ -274,28 +336,60 @@ def create_lineup_model(players: List[Player],
         model.Add(cheap_wr_count >= Config.MIN_CHEAP_WR_COUNT)
         model.Add(cheap_wr_count <= Config.MAX_CHEAP_WR_COUNT)
     
-    # Uniqueness constraint: ensure at least 3 unique players between lineups
-    for prev in used_lineups_sets:
-        # Count how many players are in common with this previous lineup
-        common_players = sum(player_vars[pid] for pid in prev if pid in player_vars)
-        
-        # Ensure at least 3 unique players (7 total - 4 common = 3 unique minimum)
-        model.Add(common_players <= 4)
-    
     # Set objective using projection
-    model.Maximize(sum(p.projection * player_vars[p.id] for p in players))
+    model.Maximize(sum(projection * expr for projection, expr in zip(arrays["projections"].tolist(), used)))
     
     return model, {
-        "player_vars": player_vars,
-        "assign": assign
+        "used": used,
+        "qb_used": qb_used,
+        "assign": assign,
+        "team_used": team_used_vars,
+        "index_by_id": {p.id: i for i, p in enumerate(players)}
     }
 
-def solve_lineup(model: cp_model.CpModel,
+def add_uniqueness_constraint(model: cp_model.CpModel,
+                              variables: Dict,
+                              lineup_ids: Set[int]) -> None:
+    """Require future lineups to differ from a solved lineup by at least 3 players."""
+    used = variables["used"]
+    index_by_id = variables["index_by_id"]
+    # Count how many players are in common with this previous lineup
+    common_players = sum(used[index_by_id[pid]] for pid in lineup_ids if pid in index_by_id)
+    
+    # Ensure at least 3 unique players (7 total - 4 common = 3 unique minimum)
+    model.Add(common_players <= 4)
+
+def add_solution_hint(model: cp_model.CpModel,
+                      solver: cp_model.CpSolver,
+                      variables: Dict) -> None:
+    """Hint every model variable with the last solution to warm-start the next solve."""
+    model.ClearHints()
+    for var in variables["qb_used"].values():
+        model.AddHint(var, solver.Value(var))
+    for slots in variables["assign"]:
+        for var in slots.values():
+            model.AddHint(var, solver.Value(var))
+    for var in variables["team_used"].values():
+        model.AddHint(var, solver.Value(var))
+
+def create_solver() -> cp_model.CpSolver:
+    """Create the CP-SAT solver shared by every lineup solve."""
+    solver = cp_model.CpSolver()
+    solver.parameters.num_search_workers = Config.NUM_SEARCH_WORKERS
+    solver.parameters.linearization_level = Config.LINEARIZATION_LEVEL
+    solver.parameters.cp_model_presolve = True
+    solver.parameters.relative_gap_limit = Config.RELATIVE_GAP_LIMIT
+    solver.parameters.max_time_in_seconds = Config.MAX_TIME_PER_LINEUP
+    solver.parameters.stop_after_first_solution = Config.STOP_AFTER_FIRST_SOLUTION
+    for name, value in Config.TUNED_SOLVER_PARAMETERS.items():
+        setattr(solver.parameters, name, value)
+    return solver
+
+def solve_lineup(solver: cp_model.CpSolver,
+                model: cp_model.CpModel,
                 players: List[Player],
-                teams: List[str],
                 variables: Dict) -> Optional[Lineup]:
     """Solve the lineup optimization model and return the solution if found."""
-    solver = cp_model.CpSolver()
     status = solver.Solve(model)
     
     if status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
@@ -304,13 +398,14 @@ def solve_lineup(model: cp_model.CpModel,
     lineup = []
     
     # Get players in lineup
-    for p in players:
-        if solver.Value(variables["player_vars"][p.id]):
-            assigned_slot = next((s for s in variables["assign"][p.id] 
-                                if solver.Value(variables["assign"][p.id][s])), None)
+    for i, p in enumerate(players):
+        assigned_slot = next((s for s in variables["assign"][i] 
+                            if solver.Value(variables["assign"][i][s])), None)
+        if assigned_slot is not None:
             lineup.append({
                 "Slot": assigned_slot,
                 "Name": p.name,
+                "Display Name": p.display_name,
                 "Team": p.team,
                 "Opponent": p.opponent,
                 "Positions": ",".join(p.positions),
@@ -318,27 +413,23 @@ def solve_lineup(model: cp_model.CpModel,
                 "Projection": p.projection,
                 "Ceiling": p.ceiling,
                 "Ownership": p.ownership,
+                "Ownership_dec": p.ownership_decimal,
                 "Id": p.id
             })
     
+    # Store players in FanDuel order so printing and export iterate directly
+    lineup.sort(key=lambda x: SLOT_ORDER[x["Slot"]])
     return Lineup(lineup)
 
-def print_lineup(lineup: Lineup, lineup_num: int, players: List[Player] = None) -> None:
+def print_lineup(lineup: Lineup, lineup_num: int, thresholds: Dict[str, float] = None) -> None:
     """Print the lineup in a formatted way."""
     print(f"=== Lineup {lineup_num} ===")
     
-    # Sort players by slot order
-    slot_order = {"QB": 0, "RB": 1, "WR": 2, "SUPER_FLEX": 3}
-    sorted_players = sorted(lineup.players, key=lambda x: slot_order[x["Slot"]])
-    
-    for player in sorted_players:
-        player_name = player['Name'].split(":")[-1].strip()
+    for player in lineup.players:
         proj_str = f" | Proj: {player['Projection']:.2f}"
         
         # Add stars-and-scrubs indicators
-        if Config.ENABLE_STARS_AND_SCRUBS:
-            # Calculate thresholds for display
-            thresholds = calculate_percentile_thresholds(players)
+        if Config.ENABLE_STARS_AND_SCRUBS and thresholds is not None:
             if player['Slot'] == 'RB' and player['Salary'] >= thresholds.get('premium_rb', 0):
                 proj_str += " [PREMIUM]"
             elif player['Slot'] == 'WR' and player['Salary'] <= thresholds.get('cheap_wr', float('inf')):
@@ -351,90 +442,89 @@ def print_lineup(lineup: Lineup, lineup_num: int, players: List[Player] = None)
     print(f"\nTotal Salary: ${total_salary}")
     print(f"Total Projection: {total_projection:.2f}")
 
-def calculate_lineup_metrics(lineup: Lineup) -> Dict[str, float]:
-    """Calculate metrics for a lineup."""
-    projection_sum = sum(p['Projection'] for p in lineup.players)
-    ceiling_sum = sum(p['Ceiling'] for p in lineup.players)
-    
-    # Calculate product of ownership (ownership is already in percentage form)
-    ownership_product = 1.0
-    for p in lineup.players:
-        ownership_decimal = p['Ownership'] / 100.0 if p['Ownership'] > 0 else 0.01  # Convert percentage to decimal
-        ownership_product *= ownership_decimal
-    
-    return {
-        'projection_sum': projection_sum,
-        'ceiling_sum': ceiling_sum,
-        'ownership_product': ownership_product
-    }
+def _compute_metrics_kernel(lineups_arr: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Projection sum, ceiling sum and ownership product for each row of a (lineups, players, 3) array."""
+    num_lineups, num_players, _ = lineups_arr.shape
+    projection_sums = np.empty(num_lineups)
+    ceiling_sums = np.empty(num_lineups)
+    ownership_products = np.empty(num_lineups)
+    for i in prange(num_lineups):
+        projection_sum = 0.0
+        ceiling_sum = 0.0
+        ownership_product = 1.0
+        for j in range(num_players):
+            projection_sum += lineups_arr[i, j, 0]
+            ceiling_sum += lineups_arr[i, j, 1]
+            ownership_product *= lineups_arr[i, j, 2]
+        projection_sums[i] = projection_sum
+        ceiling_sums[i] = ceiling_sum
+        ownership_products[i] = ownership_product
+    return projection_sums, ceiling_sums, ownership_products
 
-def rank_lineups(lineups: List[Lineup]) -> List[Tuple[Lineup, Dict]]:
+if njit is not None:
+    compute_metrics = njit(cache=True, parallel=True)(_compute_metrics_kernel)
+else:
+    def compute_metrics(lineups_arr: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """NumPy fallback for the compiled metrics kernel."""
+        return (lineups_arr[:, :, 0].sum(axis=1),
+                lineups_arr[:, :, 1].sum(axis=1),
+                lineups_arr[:, :, 2].prod(axis=1))
+
+def rank_lineups(lineups: List[Lineup], top_n: int = 150) -> List[Tuple[Lineup, Dict, float]]:
     """Rank lineups based on multiple metrics and return top 150."""
-    lineup_metrics = []
-    
-    for lineup in lineups:
-        metrics = calculate_lineup_metrics(lineup)
-        lineup_metrics.append((lineup, metrics))
-    
-    # Sort by projection sum (highest first)
-    projection_ranked = sorted(lineup_metrics, key=lambda x: x[1]['projection_sum'], reverse=True)
-    
-    # Sort by ceiling sum (highest first)
-    ceiling_ranked = sorted(lineup_metrics, key=lambda x: x[1]['ceiling_sum'], reverse=True)
-    
-    # Sort by ownership product (lowest first - lower is better)
-    ownership_ranked = sorted(lineup_metrics, key=lambda x: x[1]['ownership_product'])
+    if not lineups:
+        return []
+    
+    # Per-player (projection, ceiling, ownership decimal) for every lineup
+    lineups_arr = np.array([
+        [(p['Projection'], p['Ceiling'], p['Ownership_dec']) for p in lineup.players]
+        for lineup in lineups
+    ], dtype=np.float64)
+    metrics_matrix = np.column_stack(compute_metrics(lineups_arr))
+    lineup_metrics = [
+        {'projection_sum': float(proj), 'ceiling_sum': float(ceil), 'ownership_product': float(own)}
+        for proj, ceil, own in metrics_matrix.tolist()
+    ]
     
-    # Create ranking dictionaries
-    projection_ranks = {lineup: rank for rank, (lineup, _) in enumerate(projection_ranked, 1)}
-    ceiling_ranks = {lineup: rank for rank, (lineup, _) in enumerate(ceiling_ranked, 1)}
-    ownership_ranks = {lineup: rank for rank, (lineup, _) in enumerate(ownership_ranked, 1)}
+    # Rank each metric (1 = best): projection and ceiling highest first,
+    # ownership product lowest first (lower is better)
+    rank_keys = np.column_stack((-metrics_matrix[:, 0], -metrics_matrix[:, 1], metrics_matrix[:, 2]))
+    ranks = np.empty_like(rank_keys)
+    for col in range(rank_keys.shape[1]):
+        ranks[np.argsort(rank_keys[:, col], kind="stable"), col] = np.arange(1, len(lineups) + 1)
     
     # Calculate average rank for each lineup
-    ranked_lineups = []
-    for lineup, metrics in lineup_metrics:
-        avg_rank = (projection_ranks[lineup] + ceiling_ranks[lineup] + ownership_ranks[lineup]) / 3
-        ranked_lineups.append((lineup, metrics, avg_rank))
-    
-    # Sort by average rank (lowest first)
-    ranked_lineups.sort(key=lambda x: x[2])
+    avg_ranks = ranks.mean(axis=1)
     
-    # Return top 150 lineups
-    return ranked_lineups[:150]
+    # Sort by average rank (lowest first); the stable sort keeps the earliest-generated
+    # lineup first on ties, so the cutoff at top_n is deterministic
+    order = np.argsort(avg_ranks, kind="stable")[:top_n]
+    return [(lineups[i], lineup_metrics[i], float(avg_ranks[i])) for i in order.tolist()]
 
-def export_to_csv(lineups: List[Lineup], output_path: str) -> None:
-    """Export lineups to a CSV file in FanDuel format with metrics and rankings."""
-    # Rank lineups and get top 150
-    ranked_lineups = rank_lineups(lineups)
-    
+def export_to_csv(ranked_lineups: List[Tuple[Lineup, Dict, float]], output_path: str) -> None:
+    """Export ranked lineups to a CSV file in FanDuel format with metrics and rankings."""
     fd_position_order = ['QB', 'RB', 'RB', 'WR', 'WR', 'WR', 'SUPER_FLEX']
     
+    # Round all metrics in one pass (2, 2, 6 and 2 decimals respectively)
+    metrics_matrix = np.array([
+        (metrics['projection_sum'], metrics['ceiling_sum'], metrics['ownership_product'], avg_rank)
+        for _, metrics, avg_rank in ranked_lineups
+    ], dtype=np.float64).reshape(-1, 4)
+    for column, decimals in enumerate((2, 2, 6, 2)):
+        metrics_matrix[:, column] = np.round(metrics_matrix[:, column], decimals)
+    
+    rows = [
+        [player["Id"] for player in lineup.players] + metric_values
+        for (lineup, _, _), metric_values in zip(ranked_lineups, metrics_matrix.tolist())
+    ]
+    
     with open(output_path, 'w', newline='') as f:
         writer = csv.writer(f)
         
         # Write header with metrics
         header = fd_position_order + ['Projection_Sum', 'Ceiling_Sum', 'Ownership_Product', 'Avg_Rank']
         writer.writerow(header)
-        
-        for lineup, metrics, avg_rank in ranked_lineups:
-            position_map = {pos: [] for pos in ['QB', 'RB', 'WR', 'SUPER_FLEX']}
-            for player in lineup.players:
-                position_map[player["Slot"]].append(player)
-            
-            row = []
-            for pos in fd_position_order:
-                if position_map[pos]:
-                    row.append(position_map[pos].pop(0)["Id"])
-            
-            # Add metrics
-            row.extend([
-                round(metrics['projection_sum'], 2),
-                round(metrics['ceiling_sum'], 2),
-                round(metrics['ownership_product'], 6),
-                round(avg_rank, 2)
-            ])
-            
-            writer.writerow(row)
+        writer.writerows(rows)
     
     print(f"Exported top 150 ranked lineups to {output_path}")
     print(f"Metrics included: Projection Sum, Ceiling Sum, Ownership Product, Average Rank")
@@ -445,42 +535,51 @@ def main():
         # Load and process data
         df = load_and_clean_data(Config.DATA_FILE)
         players = create_player_objects(df)
-        teams = list(set(p.team for p in players))
+        # Salary thresholds are taken over the full pool, before exclusions
+        thresholds = calculate_percentile_thresholds(players)
+        
+        # Drop excluded players from the pool so the model never sees them
+        excluded_players = set(Config.EXCLUDED_PLAYERS)
+        players = [p for p in players if p.display_name not in excluded_players]
+        groups = group_players(players)
+        teams = list(groups["players_by_team"])
+        arrays = build_player_arrays(players)
+        
+        # Build the model and solver once; each new lineup only adds a uniqueness cut
+        model, variables = build_base_model(players, teams, groups, arrays, thresholds)
+        if Config.EXPORT_MODEL_PATH:
+            model.ExportToFile(Config.EXPORT_MODEL_PATH)
+        solver = create_solver()
         
         # Initialize tracking variables
         generated_lineups = []
-        used_lineups_sets = []
         player_counts = {}  # Track player exposure
         attempt = 0
         
         # Initialize player counts
         for player in players:
-            player_counts[player.name] = 0  # Initialize player counts
+            player_counts[player.display_name] = 0  # Initialize player counts
         
         # Generate lineups
         while (len(generated_lineups) < Config.NUM_LINEUPS_TO_GENERATE and 
                attempt < Config.MAX_ATTEMPTS):
             attempt += 1
             
-            # Create and solve model
-            model, variables = create_lineup_model(
-                players, teams, used_lineups_sets, len(generated_lineups)
-            )
-            
-            lineup = solve_lineup(model, players, teams, variables)
+            lineup = solve_lineup(solver, model, players, variables)
             if not lineup:
                 continue
             
             # Update player counts
             for player in lineup.players:
-                player_name = player["Name"].split(":")[-1].strip()
+                player_name = player["Display Name"]
                 player_counts[player_name] = player_counts.get(player_name, 0) + 1
             
             generated_lineups.append(lineup)
-            used_lineups_sets.append(set(p["Id"] for p in lineup.players))
+            add_solution_hint(model, solver, variables)
+            add_uniqueness_constraint(model, variables, set(p["Id"] for p in lineup.players))
             
             # Print lineup
-            print_lineup(lineup, len(generated_lineups), players=players)
+            print_lineup(lineup, len(generated_lineups), thresholds=thresholds)
             
             # Print exposure statistics
             if len(generated_lineups) % 10 == 0:
@@ -514,7 +613,7 @@ def main():
         
         # Export top 150 ranked lineups
         output_path = "/Users/adamsardinha/Desktop/FD_CFB_Standard_Lineups.csv"
-        export_to_csv(generated_lineups, output_path)
+        export_to_csv(ranked_lineups, output_path)
         print(f"\nGenerated {len(generated_lineups)} total lineups, exported top 150 ranked lineups to {output_path}")
         
     except Exception as e:
@@ -5,16 +5,24 @@ Handles library updates, code compliance, and performance optimizations.
 """
 
 import os
+import re
 import sys
 import subprocess
 import logging
 import json
 import shutil
 import argparse
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
 
+import requests
+from packaging.version import Version
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,6 +36,40 @@ logging.basicConfig(
 class AutoUpdater:
     """Automated updater for the MLB optimizer."""
     
+    # Automatic code fixes, applied in order as
+    # (compiled pattern, replacement, skip if this marker is already present, log message)
+    _FIXES = [
+        # Fix NumPy random usage
+        (re.compile(r'np\.random\.RandomState'), 'np.random.Generator', None,
+         "✅ Fixed NumPy RandomState usage"),
+        # Fix Pandas copy_on_write
+        (re.compile(re.escape("import pandas as pd")), """import pandas as pd
+# Enable copy-on-write optimization for better memory efficiency
+try:
+    pd.options.mode.copy_on_write = True
+except AttributeError:
+    # Fallback for older Pandas versions
+    pass""", 'pd.options.mode.copy_on_write',
+         "✅ Added Pandas copy_on_write optimization"),
+        # Fix OR-Tools solver parameters
+        (re.compile(re.escape("solver = cp_model.CpSolver()")), """solver = cp_model.CpSolver()
+    # Configure solver for better performance
+    solver.parameters.num_search_workers = 8
+    solver.parameters.max_time_in_seconds = 30.0
+    solver.parameters.cp_model_presolve = True""", 'solver.parameters.num_search_workers',
+         "✅ Added OR-Tools multi-worker support"),
+        # Fix MemoryUsage compatibility issue
+        (re.compile(r'print\(f"     - Memory usage: \{solver\.MemoryUsage\(\):\.1f\} MB"\)'), '''# Memory usage not available in current OR-Tools version
+    # print(f"     - Memory usage: {solver.MemoryUsage():.1f} MB")''', 'try:',
+         "✅ Fixed OR-Tools MemoryUsage compatibility"),
+    ]
+    
+    # How long a cached PyPI lookup is trusted before revalidating it (seconds)
+    PYPI_CACHE_TTL = 6 * 60 * 60
+    
+    # Number of update log entries to keep
+    UPDATE_LOG_LIMIT = 10
+    
     def __init__(self, optimizer_dir: str = None):
         if optimizer_dir is None:
             self.optimizer_dir = Path(__file__).parent.parent.parent
@@ -35,13 +77,19 @@ class AutoUpdater:
             self.optimizer_dir = Path(optimizer_dir)
         self.automation_dir = self.optimizer_dir / "automation"
         self.backup_dir = self.automation_dir / "backups"
-        self.log_file = self.optimizer_dir / "system_logs" / "update_log.json"
+        self.cache_dir = self.automation_dir / "cache"
+        self.log_file = self.optimizer_dir / "system_logs" / "update_log.jsonl"
         self.last_update_file = self.optimizer_dir / "system_logs" / "last_update.txt"
         
         # Create backup directory if it doesn't exist
         self.backup_dir.mkdir(exist_ok=True)
+        self.cache_dir.mkdir(exist_ok=True)
         (self.optimizer_dir / "system_logs").mkdir(exist_ok=True)
         
+        # Shared PyPI session so the version lookups reuse one keep-alive connection
+        self._http = requests.Session()
+        self._http.headers["Accept"] = "application/json"
+        
         # Libraries to monitor
         self.libraries = {
             'numpy': {
@@ -79,14 +127,14 @@ class AutoUpdater:
     
     def check_last_update(self) -> Optional[datetime]:
         """Check when the last update was performed."""
-        if self.last_update_file.exists():
-            try:
-                with open(self.last_update_file, 'r') as f:
-                    timestamp_str = f.read().strip()
-                    return datetime.fromisoformat(timestamp_str)
-            except Exception as e:
-                logging.warning(f"Could not read last update time: {e}")
-        return None
+        # The file's mtime is the timestamp, so no open or parse is needed
+        try:
+            return datetime.fromtimestamp(self.last_update_file.stat().st_mtime)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logging.warning(f"Could not read last update time: {e}")
+            return None
     
     def update_last_update_time(self):
         """Update the last update timestamp."""
@@ -96,78 +144,100 @@ class AutoUpdater:
         except Exception as e:
             logging.error(f"Failed to update timestamp: {e}")
     
+    def close(self):
+        """Close the shared PyPI session."""
+        self._http.close()
+    
+    def __del__(self):
+        if hasattr(self, '_http'):
+            self.close()
+    
+    def _fetch_latest_version(self, lib_name: str) -> str:
+        """Get the latest released version of a library from PyPI, using the on-disk cache."""
+        cache_file = self.cache_dir / f"pypi_{lib_name}.json"
+        cached = {}
+        if cache_file.exists():
+            try:
+                with open(cache_file, 'r') as f:
+                    cached = json.load(f)
+            except (OSError, ValueError):
+                cached = {}
+        
+        # Fresh cache entries skip the network entirely
+        if cached and time.time() - cached.get('fetched_at', 0) < self.PYPI_CACHE_TTL:
+            return cached['version']
+        
+        # Otherwise revalidate; an unchanged package answers 304 with no body
+        headers = {'If-None-Match': cached['etag']} if cached.get('etag') else {}
+        response = self._http.get(f"https://pypi.org/pypi/{lib_name}/json", headers=headers, timeout=10)
+        if response.status_code == 304 and cached:
+            latest_version, etag = cached['version'], cached.get('etag')
+        elif response.status_code == 200:
+            latest_version, etag = response.json()['info']['version'], response.headers.get('ETag')
+        else:
+            return "Unknown"
+        
+        try:
+            with open(cache_file, 'w') as f:
+                json.dump({'version': latest_version, 'etag': etag, 'fetched_at': time.time()}, f)
+        except OSError as e:
+            logging.warning(f"Could not cache PyPI version for {lib_name}: {e}")
+        
+        return latest_version
+    
     def check_library_versions(self) -> Dict[str, Dict]:
         """Check current and latest library versions."""
         versions = {}
         
-        for lib_name in self.libraries.keys():
-            try:
-                # Get current version
-                result = subprocess.run([
-                    sys.executable, '-c', f'import {lib_name}; print({lib_name}.__version__)'
-                ], capture_output=True, text=True, check=True)
-                current_version = result.stdout.strip()
-                
-                # Get latest version from PyPI
-                import requests
-                response = requests.get(f"https://pypi.org/pypi/{lib_name}/json", timeout=10)
-                latest_version = "Unknown"
-                if response.status_code == 200:
-                    latest_version = response.json()['info']['version']
-                
-                versions[lib_name] = {
-                    'current': current_version,
-                    'latest': latest_version,
-                    'needs_update': self._version_compare(current_version, latest_version) < 0
-                }
-                
-            except Exception as e:
-                logging.warning(f"Could not check version for {lib_name}: {e}")
-                versions[lib_name] = {
-                    'current': 'Unknown',
-                    'latest': 'Unknown',
-                    'needs_update': False
-                }
+        # The PyPI lookups are independent network waits, so run them all at once
+        with ThreadPoolExecutor(max_workers=len(self.libraries)) as executor:
+            latest_futures = {
+                lib_name: executor.submit(self._fetch_latest_version, lib_name)
+                for lib_name in self.libraries
+            }
+            
+            for lib_name, latest_future in latest_futures.items():
+                try:
+                    # Get current version from the installed package metadata
+                    # (no interpreter start-up or import of the library needed)
+                    current_version = metadata.version(lib_name)
+                    
+                    # Get latest version from PyPI
+                    latest_version = latest_future.result()
+                    
+                    versions[lib_name] = {
+                        'current': current_version,
+                        'latest': latest_version,
+                        'needs_update': latest_version != "Unknown" and Version(current_version) < Version(latest_version)
+                    }
+                    
+                except Exception as e:
+                    logging.warning(f"Could not check version for {lib_name}: {e}")
+                    versions[lib_name] = {
+                        'current': 'Unknown',
+                        'latest': 'Unknown',
+                        'needs_update': False
+                    }
         
         return versions
     
-    def _version_compare(self, version1: str, version2: str) -> int:
-        """Compare version strings."""
-        try:
-            from packaging import version
-            return version.parse(version1).__cmp__(version.parse(version2))
-        except ImportError:
-            # Fallback version comparison
-            v1_parts = [int(x) for x in version1.split('.')]
-            v2_parts = [int(x) for x in version2.split('.')]
-            
-            for i in range(max(len(v1_parts), len(v2_parts))):
-                v1_part = v1_parts[i] if i < len(v1_parts) else 0
-                v2_part = v2_parts[i] if i < len(v2_parts) else 0
-                
-                if v1_part < v2_part:
-                    return -1
-                elif v1_part > v2_part:
-                    return 1
-            
-            return 0
-    
     def update_libraries(self, libraries_to_update: List[str]) -> bool:
         """Update specified libraries."""
-        success = True
-        
-        for lib in libraries_to_update:
-            try:
-                logging.info(f"🔄 Updating {lib}...")
-                result = subprocess.run([
-                    sys.executable, '-m', 'pip', 'install', '--upgrade', lib
-                ], capture_output=True, text=True, check=True)
-                logging.info(f"✅ Successfully updated {lib}")
-            except subprocess.CalledProcessError as e:
-                logging.error(f"❌ Failed to update {lib}: {e}")
-                success = False
+        if not libraries_to_update:
+            return True
         
-        return success
+        # One pip run resolves all upgrades together instead of starting pip per library;
+        # pip's output streams straight to the console rather than being buffered here
+        try:
+            logging.info(f"🔄 Updating {', '.join(libraries_to_update)}...")
+            subprocess.run([
+                sys.executable, '-m', 'pip', 'install', '--upgrade', *libraries_to_update
+            ], check=True)
+            logging.info(f"✅ Successfully updated {', '.join(libraries_to_update)}")
+            return True
+        except subprocess.CalledProcessError as e:
+            logging.error(f"❌ Failed to update {', '.join(libraries_to_update)}: {e}")
+            return False
     
     def test_optimizer(self) -> bool:
         """Test the optimizer after updates."""
@@ -248,58 +318,20 @@ class AutoUpdater:
             with open(optimizer_file, 'r') as f:
                 content = f.read()
             
-            # Apply automatic fixes
+            # Apply automatic fixes in a single pass over the precompiled patterns
             fixes_applied = 0
-            
-            # Fix NumPy random usage
-            if 'np.random.RandomState' in content:
-                content = content.replace('np.random.RandomState', 'np.random.Generator')
-                fixes_applied += 1
-                logging.info("✅ Fixed NumPy RandomState usage")
-            
-            # Fix Pandas copy_on_write
-            if 'pd.options.mode.copy_on_write' not in content:
-                # Add copy_on_write optimization
-                import_pattern = "import pandas as pd"
-                if import_pattern in content:
-                    copy_on_write_code = """
-# Enable copy-on-write optimization for better memory efficiency
-try:
-    pd.options.mode.copy_on_write = True
-except AttributeError:
-    # Fallback for older Pandas versions
-    pass"""
-                    content = content.replace(import_pattern, import_pattern + copy_on_write_code)
+            for pattern, replacement, marker, message in self._FIXES:
+                if marker and marker in content:
+                    continue
+                content, count = pattern.subn(lambda _match, text=replacement: text, content)
+                if count:
                     fixes_applied += 1
-                    logging.info("✅ Added Pandas copy_on_write optimization")
+                    logging.info(message)
             
-            # Fix OR-Tools solver parameters
-            if 'solver.parameters.num_search_workers' not in content:
-                # Add multi-worker support
-                solver_pattern = "solver = cp_model.CpSolver()"
-                if solver_pattern in content:
-                    worker_code = """
-    # Configure solver for better performance
-    solver.parameters.num_search_workers = 8
-    solver.parameters.max_time_in_seconds = 30.0
-    solver.parameters.cp_model_presolve = True"""
-                    content = content.replace(solver_pattern, solver_pattern + worker_code)
-                    fixes_applied += 1
-                    logging.info("✅ Added OR-Tools multi-worker support")
-            
-            # Fix MemoryUsage compatibility issue
-            if 'solver.MemoryUsage()' in content and 'try:' not in content:
-                # Replace direct MemoryUsage call with try-catch
-                memory_pattern = r'print\(f"     - Memory usage: \{solver\.MemoryUsage\(\):\.1f\} MB"\)'
-                memory_replacement = '''# Memory usage not available in current OR-Tools version
-    # print(f"     - Memory usage: {solver.MemoryUsage():.1f} MB")'''
-                content = re.sub(memory_pattern, memory_replacement, content)
-                fixes_applied += 1
-                logging.info("✅ Fixed OR-Tools MemoryUsage compatibility")
-            
-            # Write updated content
-            with open(optimizer_file, 'w') as f:
-                f.write(content)
+            # Only rewrite the file when something changed
+            if fixes_applied:
+                with open(optimizer_file, 'w') as f:
+                    f.write(content)
             
             logging.info(f"✅ Applied {fixes_applied} automatic fixes")
             return True
@@ -346,21 +378,27 @@ except AttributeError:
                 logging.error("❌ Failed to apply automatic fixes")
                 return False
             
-            # Test the optimizer
+            # Test the optimizer before anything else writes to disk
             if not self.test_optimizer():
                 logging.error("❌ Optimizer test failed after updates")
                 return False
             
-            # Update requirements.txt
-            if not self.update_requirements():
-                logging.error("❌ Failed to update requirements")
-                return False
-            
-            # Run update checker
-            update_report = self.run_update_checker()
-            
-            # Generate updated compliance report
-            self.generate_compliance_report()
+            # The remaining steps are independent, so run the update checker and
+            # compliance report alongside the requirements.txt rewrite
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                # Run update checker
+                checker_future = executor.submit(self.run_update_checker)
+                
+                # Generate updated compliance report
+                compliance_future = executor.submit(self.generate_compliance_report)
+                
+                # Update requirements.txt
+                if not self.update_requirements():
+                    logging.error("❌ Failed to update requirements")
+                    return False
+                
+                update_report = checker_future.result()
+                compliance_future.result()
             
             # Update timestamp
             self.update_last_update_time()
@@ -385,21 +423,21 @@ except AttributeError:
                 'status': 'success'
             }
             
-            # Read existing log
-            log_data = []
-            if self.log_file.exists():
-                with open(self.log_file, 'r') as f:
-                    log_data = json.load(f)
-            
-            # Add new entry
-            log_data.append(log_entry)
-            
-            # Keep only last 10 entries
-            log_data = log_data[-10:]
-            
-            # Write updated log
-            with open(self.log_file, 'w') as f:
-                json.dump(log_data, f, indent=2)
+            # Append the entry as one JSON line; existing entries are never parsed
+            with open(self.log_file, 'a') as f:
+                f.write(json.dumps(log_entry) + '\n')
+            
+            # Keep only the last entries, compacting once the file has doubled in size
+            line_count = 0
+            recent = deque(maxlen=self.UPDATE_LOG_LIMIT)
+            with open(self.log_file, 'r') as f:
+                for line in f:
+                    line_count += 1
+                    recent.append(line)
+            
+            if line_count > 2 * self.UPDATE_LOG_LIMIT:
+                with open(self.log_file, 'w') as f:
+                    f.writelines(recent)
                 
         except Exception as e:
             logging.error(f"Failed to log update success: {e}")
@@ -10,8 +10,52 @@ import subprocess
 import platform
 from pathlib import Path
 from datetime import datetime
+from types import MappingProxyType
+from typing import Mapping
 import json
 
+# Preset schedules, built once at import. Read-only views so callers can't
+# change the shared presets.
+_SCHEDULE_OPTIONS = MappingProxyType({
+    '1': MappingProxyType({
+        'name': 'Daily (9:00 AM)',
+        'description': 'Update every day at 9:00 AM',
+        'cron': '0 9 * * *',
+        'launchd': MappingProxyType({'Hour': 9, 'Minute': 0})
+    }),
+    '2': MappingProxyType({
+        'name': 'Weekly (Monday 9:00 AM)',
+        'description': 'Update every Monday at 9:00 AM',
+        'cron': '0 9 * * 1',
+        'launchd': MappingProxyType({'Weekday': 1, 'Hour': 9, 'Minute': 0})
+    }),
+    '3': MappingProxyType({
+        'name': 'Weekly (Sunday 6:00 PM)',
+        'description': 'Update every Sunday at 6:00 PM',
+        'cron': '0 18 * * 0',
+        'launchd': MappingProxyType({'Weekday': 0, 'Hour': 18, 'Minute': 0})
+    }),
+    '4': MappingProxyType({
+        'name': 'Bi-weekly (Alternating Mondays)',
+        'description': 'Update every other Monday at 9:00 AM',
+        'cron': '0 9 * * 1',
+        'launchd': MappingProxyType({'Weekday': 1, 'Hour': 9, 'Minute': 0}),
+        'custom_logic': 'bi_weekly'
+    }),
+    '5': MappingProxyType({
+        'name': 'Monthly (First Monday)',
+        'description': 'Update first Monday of each month at 9:00 AM',
+        'cron': '0 9 1-7 * 1',
+        'launchd': MappingProxyType({'Weekday': 1, 'Hour': 9, 'Minute': 0}),
+        'custom_logic': 'monthly'
+    }),
+    '6': MappingProxyType({
+        'name': 'Custom Schedule',
+        'description': 'Define your own schedule',
+        'custom': True
+    })
+})
+
 class ScheduleCustomizer:
     """Customize the automation schedule for different frequencies."""
     
@@ -32,51 +76,13 @@ class ScheduleCustomizer:
         with open(self.config_file, 'w') as f:
             json.dump(config, f, indent=2)
     
-    def get_schedule_options(self) -> dict:
+    def get_schedule_options(self) -> Mapping:
         """Get available schedule options."""
-        return {
-            '1': {
-                'name': 'Daily (9:00 AM)',
-                'description': 'Update every day at 9:00 AM',
-                'cron': '0 9 * * *',
-                'launchd': {'Hour': 9, 'Minute': 0}
-            },
-            '2': {
-                'name': 'Weekly (Monday 9:00 AM)',
-                'description': 'Update every Monday at 9:00 AM',
-                'cron': '0 9 * * 1',
-                'launchd': {'Weekday': 1, 'Hour': 9, 'Minute': 0}
-            },
-            '3': {
-                'name': 'Weekly (Sunday 6:00 PM)',
-                'description': 'Update every Sunday at 6:00 PM',
-                'cron': '0 18 * * 0',
-                'launchd': {'Weekday': 0, 'Hour': 18, 'Minute': 0}
-            },
-            '4': {
-                'name': 'Bi-weekly (Alternating Mondays)',
-                'description': 'Update every other Monday at 9:00 AM',
-                'cron': '0 9 * * 1',
-                'launchd': {'Weekday': 1, 'Hour': 9, 'Minute': 0},
-                'custom_logic': 'bi_weekly'
-            },
-            '5': {
-                'name': 'Monthly (First Monday)',
-                'description': 'Update first Monday of each month at 9:00 AM',
-                'cron': '0 9 1-7 * 1',
-                'launchd': {'Weekday': 1, 'Hour': 9, 'Minute': 0},
-                'custom_logic': 'monthly'
-            },
-            '6': {
-                'name': 'Custom Schedule',
-                'description': 'Define your own schedule',
-                'custom': True
-            }
-        }
+        return _SCHEDULE_OPTIONS
     
     def display_schedule_options(self):
         """Display available schedule options."""
-        options = self.get_schedule_options()
+        options = _SCHEDULE_OPTIONS
         
         print("📅 Available Schedule Options:")
         print("=" * 40)
@@ -320,7 +326,7 @@ Register-ScheduledTask -TaskName "MLB Optimizer Update" -Action $action -Trigger
         # Get user choice
         choice = input("Enter your choice (1-6): ").strip()
         
-        options = self.get_schedule_options()
+        options = _SCHEDULE_OPTIONS
         if choice not in options:
             print("❌ Invalid choice")
             return False
@@ -20,4 +20,6 @@ class Player:
     roster_order: int = 0  # Added for consecutive order constraints
 
     def __post_init__(self):
-        self.current_projection = self.projection  # Initialize current projection 
\ No newline at end of file
+        self.current_projection = self.projection  # Initialize current projection
+        self.short_name = self.name.split(":")[-1].strip()  # Name without the FanDuel ID prefix
+        self.projection_int = int(round(self.projection * 100))  # Integer objective weight
\ No newline at end of file
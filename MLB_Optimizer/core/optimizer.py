@@ -5,11 +5,19 @@ This script generates optimized lineups for MLB DFS contests using constraint pr
 
 from typing import List, Dict, Set, Tuple, Optional
 import pandas as pd
+import numpy as np
 from ortools.sat.python import cp_model
 import os
 from dataclasses import dataclass
+from collections import Counter, defaultdict
 from pathlib import Path
-import csv
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pv
+except ImportError:
+    pa = None  # Fall back to pandas CSV parsing
 
 # ===== Configuration =====
 class Config:
@@ -74,6 +82,14 @@ class Config:
     # Exposure settings
     RECENT_TEAMS_WINDOW = 5  # Number of recent lineups to track for each team
     MIN_TEAM_EXPOSURE = 0.05  # Minimum exposure for each team
+    UNIQUENESS_WINDOW = None  # Only keep uniqueness cuts against the last N lineups (None = all)
+    
+    # Solver settings
+    NUM_SEARCH_WORKERS = 1  # Worker start-up outweighs parallel search on a model this small
+    MAX_TIME_PER_LINEUP = 2.0  # Seconds per solve
+    LINEARIZATION_LEVEL = 2  # LP relaxation proves optimality within the 2s cap; level 1 mostly times out
+    REPAIR_HINT = False  # Repair the previous lineup's hint instead of just trying it first
+    HINT_CONFLICT_LIMIT = 100  # Conflicts allowed while repairing the hint
 
 # Import data models
 try:
@@ -89,81 +105,167 @@ except ImportError:
     
 
 
+# Allowed (team stack size, is_primary, is_secondary) combinations
+STACK_FLAG_ASSIGNMENTS = [(size, 0, 0) for size in range(9) if size != 4] + [(3, 0, 1), (4, 1, 0)]
+
 def load_and_clean_data(file_path: str) -> Tuple[pd.DataFrame, Set[int]]:
     """Load and clean the player data from CSV file."""
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Data file not found: {file_path}")
     
-    df = pd.read_csv(file_path)
-    
-    # Convert columns to appropriate types
-    numeric_columns = ["FPPG", "Salary", "Roster Order"]
-    for col in numeric_columns:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-    
-    df["Position"] = df["Position"].astype(str)
-    
-    # Filter out invalid roster positions
-    df = df[(df["Roster Order"] > 0) | (df["Position"] == "P")]
+    df = read_player_table(file_path) if pa is not None else None
+    if df is None:
+        df = pd.read_csv(file_path)
+        
+        # Convert columns to appropriate types
+        numeric_columns = ["FPPG", "Salary", "Roster Order"]
+        for col in numeric_columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        
+        df["Position"] = df["Position"].astype(str)
+        
+        # Filter out invalid roster positions
+        df = df[(df["Roster Order"] > 0) | (df["Position"] == "P")]
     
     # Get IDs of players in roster positions 8 and 9
     ro8_9_ids = set(df[df["Roster Order"].isin([8, 9])]["Id"])
     
     return df, ro8_9_ids
 
+def read_player_table(file_path: str) -> Optional[pd.DataFrame]:
+    """Parse the CSV with pyarrow's typed reader and filter rows before converting to pandas.
+    
+    Returns None if a numeric column holds text, so the caller can fall back
+    to pandas' coercing parser.
+    """
+    convert_options = pv.ConvertOptions(column_types={
+        "Id": pa.string(),
+        "Position": pa.string(),
+        "FPPG": pa.float64(),
+        "Salary": pa.float64(),
+        "Roster Order": pa.float64()
+    })
+    try:
+        table = pv.read_csv(file_path, convert_options=convert_options)
+    except pa.ArrowInvalid:
+        return None
+    
+    # Filter out invalid roster positions (null roster orders only pass for pitchers)
+    keep = pc.or_kleene(pc.greater(table["Roster Order"], 0), pc.equal(table["Position"], "P"))
+    return table.filter(keep).to_pandas()
+
 def create_player_objects(df: pd.DataFrame) -> List[Player]:
     """Convert DataFrame rows to Player objects."""
+    # Extract each column once instead of materialising a Series per row
+    ids = df["Id"].to_numpy()
+    names = df["Player ID + Player Name"].to_numpy()
+    positions = df["Position"].to_numpy()
+    teams = df["Team"].to_numpy()
+    opponents = df["Opponent"].to_numpy()
+    # A blank or non-numeric salary would cast to a huge negative int, so fail loudly instead
+    missing_salary = df["Salary"].isna().to_numpy()
+    if missing_salary.any():
+        raise ValueError(f"Missing or invalid Salary for players: {list(names[missing_salary])}")
+    salaries = df["Salary"].to_numpy(np.int64)
+    projections = df["FPPG"].to_numpy(np.float64).round(2)
+    roster_orders = df["Roster Order"].to_numpy(np.float64)
+    if "Projected Ownership" in df.columns:
+        ownerships = df["Projected Ownership"].to_numpy(np.float64)
+    else:
+        ownerships = np.zeros(len(df))
+    
     players = []
-    for _, row in df.iterrows():
-        positions = row["Position"].split("/")
-        name = row["Player ID + Player Name"]
+    for i in range(len(df)):
+        player_positions = positions[i].split("/")
+        is_pitcher = "P" in player_positions
         
         # Get roster order, defaulting to 0 for pitchers
         roster_order = 0
-        if "P" not in positions:
-            try:
-                roster_order = int(row["Roster Order"])
-            except (ValueError, TypeError):
-                print(f"Warning: Invalid roster order for {name}: {row['Roster Order']}")
-                roster_order = 0
+        if not is_pitcher:
+            if np.isnan(roster_orders[i]):
+                print(f"Warning: Invalid roster order for {names[i]}: {roster_orders[i]}")
+            else:
+                roster_order = int(roster_orders[i])
         
         players.append(Player(
-            id=row["Id"],
-            name=name,
-            positions=positions,
-            team=row["Team"],
-            opponent=row["Opponent"],
-            salary=int(row["Salary"]),
-            projection=round(row["FPPG"], 2),
-            is_pitcher="P" in positions,
-            ownership=float(row.get("Projected Ownership", 0)),
+            id=ids[i],
+            name=names[i],
+            positions=player_positions,
+            team=teams[i],
+            opponent=opponents[i],
+            salary=int(salaries[i]),
+            projection=float(projections[i]),
+            is_pitcher=is_pitcher,
+            ownership=float(ownerships[i]),
             roster_order=roster_order
         ))
     return players
 
-def create_lineup_model(players: List[Player], 
-                       teams: List[str],
-                       primary_stack_counts: Dict[str, int],
-                       secondary_stack_counts: Dict[str, int],
-                       recent_primary_teams: Dict[str, int],
-                       recent_secondary_teams: Dict[str, int],
-                       used_lineups_sets: List[Set[int]],
-                       ro8_9_ids: Set[int],
-                       num_generated_lineups: int) -> Tuple[cp_model.CpModel, Dict]:
-    """Create the constraint programming model for lineup optimization."""
+def prune_unaffordable_players(players: List[Player]) -> List[Player]:
+    """Drop players who exceed the salary cap even alongside the cheapest possible teammates."""
+    pitcher_salaries = sorted(p.salary for p in players if p.is_pitcher)
+    batter_salaries = sorted(p.salary for p in players if not p.is_pitcher)
+    if not pitcher_salaries or len(batter_salaries) < 8:
+        return players
+    
+    # Lower bounds on the rest of the lineup, ignoring positions (1 P + 8 batters)
+    cheapest_8 = sum(batter_salaries[:8])
+    cheapest_7 = sum(batter_salaries[:7])
+    eighth_cheapest = batter_salaries[7]
+    
+    affordable = []
+    for p in players:
+        if p.is_pitcher:
+            min_fill = cheapest_8
+        else:
+            # Leave the player out of the cheapest batters they would otherwise count in
+            min_fill = pitcher_salaries[0] + (
+                cheapest_8 - p.salary if p.salary <= eighth_cheapest else cheapest_7
+            )
+        if p.salary + min_fill <= Config.MAX_SALARY:
+            affordable.append(p)
+    return affordable
+
+def group_players(players: List[Player]) -> Dict:
+    """Filter the pool and index it once per slate, before any model is built."""
+    excluded_players_set = frozenset(Config.EXCLUDED_PLAYERS)
+    
+    # Only non-excluded players that fit under the cap get variables
+    valid_players = prune_unaffordable_players(
+        [p for p in players if p.short_name not in excluded_players_set]
+    )
+    
+    # Index batters by team in one pass so no constraint rescans the pool
+    batters_by_team: Dict[str, List[Player]] = defaultdict(list)
+    for p in valid_players:
+        if not p.is_pitcher:
+            batters_by_team[p.team].append(p)
+    
+    return {
+        "valid_players": valid_players,
+        "pitchers": [p for p in valid_players if p.is_pitcher],
+        "batters_by_team": batters_by_team,
+        "owned_by_team": {
+            team: sorted(batters, key=lambda x: x.ownership, reverse=True)
+            for team, batters in batters_by_team.items()
+        }
+    }
+
+def build_base_model(groups: Dict,
+                     teams: List[str],
+                     ro8_9_ids: Set[int]) -> Tuple[cp_model.CpModel, Dict]:
+    """Create the invariant part of the lineup model once.
+
+    Exposure bans and uniqueness cuts change between attempts and are
+    attached afterwards by add_iteration_constraints.
+    """
     model = cp_model.CpModel()
     
     # Set model name for better debugging
     model.Name = "MLB_Lineup_Optimization"
     
-    # Pre-compute player lists for better performance (optimized)
-    pitchers = [p for p in players if p.is_pitcher]
-    batters = [p for p in players if not p.is_pitcher]
-    team_batters = {team: [p for p in batters if p.team == team] for team in teams}
-    
-    # Pre-compute excluded players set for faster lookups
-    excluded_players_set = set(Config.EXCLUDED_PLAYERS)
-    one_off_players_set = set(Config.ONE_OFF_PLAYERS)
+    # Pre-compute one-off players set for faster lookups
+    one_off_players_set = frozenset(Config.ONE_OFF_PLAYERS)
     
     # Create player variables (optimized with early filtering)
     player_vars = {}
@@ -171,19 +273,20 @@ def create_lineup_model(players: List[Player],
     is_primary_team = {}
     is_secondary_team = {}
     
-    # Only create variables for non-excluded players
-    valid_players = [p for p in players if p.name.split(":")[-1].strip() not in excluded_players_set]
+    # Only create variables for the filtered pool from group_players
+    valid_players = groups["valid_players"]
+    pitchers = groups["pitchers"]
+    batters_by_team = groups["batters_by_team"]
     
     for p in valid_players:
         player_vars[p.id] = model.NewBoolVar(f"player_{p.id}")
         assign[p.id] = {}
         
-        # Optimize assignment variable creation
+        # Optimize assignment variable creation (UTIL has no variables, see below)
         for slot in Config.SLOTS:
             can_play = (
                 (slot == "P" and p.is_pitcher) or
                 (slot == "C/1B" and any(pos in ["C", "1B", "C/1B"] for pos in p.positions)) or
-                (slot == "UTIL" and not p.is_pitcher) or
                 (slot in p.positions)
             )
             if can_play:
@@ -193,40 +296,43 @@ def create_lineup_model(players: List[Player],
     for slot, count in Config.SLOTS.items():
         slot_players = [p for p in valid_players if slot in assign.get(p.id, {})]
         if slot_players:
-            model.Add(sum(assign[p.id][slot] for p in slot_players) == count)
+            model.Add(cp_model.LinearExpr.Sum([assign[p.id][slot] for p in slot_players]) == count)
     
-    # Optimize player assignment constraints
+    # Optimize player assignment constraints. The 9-player and 1-pitcher totals
+    # below leave exactly one selected batter without a slot, and that batter is UTIL
     for p in valid_players:
         if assign[p.id]:
-            model.Add(sum(assign[p.id][s] for s in assign[p.id]) <= 1)
-            model.Add(sum(assign[p.id][s] for s in assign[p.id]) == player_vars[p.id])
+            slot_sum = cp_model.LinearExpr.Sum(list(assign[p.id].values()))
+            if p.is_pitcher:
+                model.Add(slot_sum == player_vars[p.id])
+            else:
+                model.Add(slot_sum <= player_vars[p.id])
     
     # Core lineup constraints (optimized)
-    model.Add(sum(player_vars[p.id] for p in valid_players) == 9)
-    model.Add(sum(p.salary * player_vars[p.id] for p in valid_players) <= Config.MAX_SALARY)
-    model.Add(sum(player_vars[p.id] for p in valid_players if p.is_pitcher) == 1)
+    valid_vars = [player_vars[p.id] for p in valid_players]
+    model.Add(cp_model.LinearExpr.Sum(valid_vars) == 9)
+    model.Add(cp_model.LinearExpr.WeightedSum(valid_vars, [p.salary for p in valid_players]) <= Config.MAX_SALARY)
+    model.Add(cp_model.LinearExpr.Sum([player_vars[p.id] for p in pitchers]) == 1)
     
-    # Optimize pitcher-opponent constraints with pre-computed lists
+    # Optimize pitcher-opponent constraints: one constraint per pitcher that rules
+    # out every opposing batter, instead of one per (pitcher, batter) pair
     for p in pitchers:
-        if p.id in player_vars:  # Only if pitcher is valid
-            opponents = [opp for opp in batters if opp.team == p.opponent and opp.id in player_vars]
-            if opponents:
-                # Use more efficient constraint: at most one of pitcher or opponent can be selected
-                for opp in opponents:
-                    model.Add(player_vars[p.id] + player_vars[opp.id] <= 1)
+        opponents = batters_by_team.get(p.opponent)
+        if opponents:
+            model.Add(cp_model.LinearExpr.Sum([player_vars[opp.id] for opp in opponents]) == 0).OnlyEnforceIf(player_vars[p.id])
     
     # Optimize Roster Order 8/9 constraint
-    ro8_9_batters = [p for p in batters if p.id in ro8_9_ids and p.id in player_vars]
+    ro8_9_batters = [p for p in valid_players if not p.is_pitcher and p.id in ro8_9_ids]
     if ro8_9_batters:
-        model.Add(sum(player_vars[p.id] for p in ro8_9_batters) <= 1)
+        model.Add(cp_model.LinearExpr.Sum([player_vars[p.id] for p in ro8_9_batters]) <= 1)
     
     # Optimize team stack variables
     team_stack_vars = {t: model.NewIntVar(0, 8, f"stack_{t}") for t in teams}
     for team in teams:
-        team_valid_batters = [p for p in team_batters[team] if p.id in player_vars]
+        team_valid_batters = batters_by_team.get(team)
         if team_valid_batters:
-            model.Add(team_stack_vars[team] == sum(
-                player_vars[p.id] for p in team_valid_batters
+            model.Add(team_stack_vars[team] == cp_model.LinearExpr.Sum(
+                [player_vars[p.id] for p in team_valid_batters]
             ))
         else:
             model.Add(team_stack_vars[team] == 0)
@@ -241,21 +347,12 @@ def create_lineup_model(players: List[Player],
         is_primary_team[team] = is_primary
         is_secondary_team[team] = is_secondary
         
-        # Optimize stack constraints
-        model.Add(team_stack_vars[team] == 4).OnlyEnforceIf(is_primary)
-        model.Add(team_stack_vars[team] != 4).OnlyEnforceIf(is_primary.Not())
-        
-        # Optimize secondary stack constraints
-        is_secondary_3 = model.NewBoolVar(f"secondary_3_{team}")
-        is_secondary_4 = model.NewBoolVar(f"secondary_4_{team}")
-        
-        model.Add(team_stack_vars[team] == 3).OnlyEnforceIf(is_secondary_3)
-        model.Add(team_stack_vars[team] == 4).OnlyEnforceIf(is_secondary_4)
-        model.Add(is_secondary_3 + is_secondary_4 == 1).OnlyEnforceIf(is_secondary)
-        model.Add(is_secondary_3 + is_secondary_4 == 0).OnlyEnforceIf(is_secondary.Not())
-        
-        # A team cannot be both primary and secondary
-        model.AddBoolOr([is_primary.Not(), is_secondary.Not()])
+        # Channel stack size and primary/secondary flags through one table:
+        # primary exactly when 4 batters, secondary only with 3, never both
+        model.AddAllowedAssignments(
+            [team_stack_vars[team], is_primary, is_secondary],
+            STACK_FLAG_ASSIGNMENTS
+        )
         
         # Exclude teams from primary stack usage
         if team in Config.PRIMARY_STACK_EXCLUDED_TEAMS:
@@ -265,33 +362,19 @@ def create_lineup_model(players: List[Player],
         secondary_flags.append(is_secondary)
     
     # Exactly one primary stack and one secondary stack
-    model.Add(sum(primary_flags) == 1)
-    model.Add(sum(secondary_flags) == 1)
+    model.Add(cp_model.LinearExpr.Sum(primary_flags) == 1)
+    model.Add(cp_model.LinearExpr.Sum(secondary_flags) == 1)
     
-    # Optimize one-off player constraints
+    # Optimize one-off player constraints: a selected batter outside the one-off
+    # list must come from the primary or secondary stack team
     if Config.ENABLE_ONE_OFF_PLAYERS and Config.ONE_OFF_PLAYERS:
-        # Create variables for each player indicating if they're in a stack
-        in_stack_vars = {}
         for p in valid_players:
-            if not p.is_pitcher and p.id in player_vars:
-                in_stack_vars[p.id] = model.NewBoolVar(f"in_stack_{p.id}")
-                # Player is in a stack if their team is primary or secondary
-                model.Add(in_stack_vars[p.id] == 1).OnlyEnforceIf([
+            if not p.is_pitcher and p.short_name not in one_off_players_set:
+                model.AddBoolOr([
+                    player_vars[p.id].Not(),
                     is_primary_team[p.team],
                     is_secondary_team[p.team]
                 ])
-                model.Add(in_stack_vars[p.id] == 0).OnlyEnforceIf([
-                    is_primary_team[p.team].Not(),
-                    is_secondary_team[p.team].Not()
-                ])
-        
-        # For each non-stack player, they must be in the one-off list
-        for p in valid_players:
-            if not p.is_pitcher and p.id in player_vars:
-                is_one_off = p.name.split(":")[-1].strip() in one_off_players_set
-                if not is_one_off:
-                    # If player is not in one-off list, they must be in a stack
-                    model.Add(in_stack_vars[p.id] == 1).OnlyEnforceIf(player_vars[p.id])
     
     # Optimize primary-secondary stack pairing constraints
     for primary_team, allowed_secondary_teams in Config.PRIMARY_SECONDARY_PAIRS.items():
@@ -311,55 +394,84 @@ def create_lineup_model(players: List[Player],
                     if team not in allowed_secondary_teams:
                         model.AddImplication(is_primary_team[primary_team], is_secondary_team[team].Not())
     
-    # Optimize exposure constraints
-    for team in teams:
-        # Calculate current exposure
-        current_primary_exposure = primary_stack_counts.get(team, 0) / max(1, num_generated_lineups)
-        current_secondary_exposure = secondary_stack_counts.get(team, 0) / max(1, num_generated_lineups)
-        
-        # Add primary stack constraints
-        if current_primary_exposure >= Config.MAX_PRIMARY_STACK_PCT:
-            model.Add(is_primary_team[team] == 0)
-        elif recent_primary_teams.get(team, 0) >= Config.RECENT_TEAMS_WINDOW:
-            model.Add(is_primary_team[team] == 0)
-        
-        # Add secondary stack constraints
-        if current_secondary_exposure >= Config.MAX_SECONDARY_STACK_PCT:
-            model.Add(is_secondary_team[team] == 0)
-        elif recent_secondary_teams.get(team, 0) >= Config.RECENT_TEAMS_WINDOW:
-            model.Add(is_secondary_team[team] == 0)
-    
-    # Optimize uniqueness constraints
-    for prev in used_lineups_sets:
-        # Ensure at least 2 unique players compared to previous lineups
-        prev_valid_players = [pid for pid in prev if pid in player_vars]
-        if prev_valid_players:
-            model.Add(sum(player_vars[pid] for pid in prev_valid_players) <= 6)
-    
     # Add stack rules if enabled
     if Config.ENABLED_STACK_RULES:
-        add_stack_rules(model, valid_players, player_vars, is_primary_team, is_secondary_team)
-    
-    # Set objective using projection (optimized)
-    model.Maximize(sum(p.projection * player_vars[p.id] for p in valid_players))
+        add_stack_rules(model, valid_players, groups["owned_by_team"], player_vars, is_primary_team, is_secondary_team)
     
-    # Optimized model validation
-    try:
-        # Quick validation without solving
-        model.Validate()
-        print("✅ Model validation passed")
-    except Exception as e:
-        print(f"⚠️  Warning: Model validation error: {e}")
+    # Set objective using projection in hundredths so CP-SAT keeps integer coefficients
+    model.Maximize(cp_model.LinearExpr.WeightedSum(valid_vars, [p.projection_int for p in valid_players]))
     
     return model, {
         "player_vars": player_vars,
         "assign": assign,
         "is_primary_team": is_primary_team,
-        "is_secondary_team": is_secondary_team
+        "is_secondary_team": is_secondary_team,
+        "valid_players": valid_players,
+        "num_uniqueness_cuts": 0,
+        "uniqueness_literals": []
     }
 
+def validate_model(model: cp_model.CpModel) -> None:
+    """Validate the base model once, before the first attempt."""
+    # Validate returns an error string rather than raising
+    error = model.Validate()
+    if error:
+        print(f"⚠️  Warning: Model validation error: {error}")
+    else:
+        print("✅ Model validation passed")
+
+def add_iteration_constraints(model: cp_model.CpModel,
+                              variables: Dict,
+                              teams: List[str],
+                              primary_stack_counts: np.ndarray,
+                              secondary_stack_counts: np.ndarray,
+                              recent_primary_teams: np.ndarray,
+                              recent_secondary_teams: np.ndarray,
+                              used_lineups_sets: List[Set[int]],
+                              num_generated_lineups: int) -> None:
+    """Attach the per-attempt exposure bans and uniqueness cuts to the base model."""
+    player_vars = variables["player_vars"]
+    is_primary_team = variables["is_primary_team"]
+    is_secondary_team = variables["is_secondary_team"]
+    
+    uniqueness_literals = variables["uniqueness_literals"]
+    
+    # Uniqueness cuts stay in the model, so only lineups added since the last call need one.
+    # They are appended to the proto directly, skipping model.Add's expression checks
+    for prev in used_lineups_sets[variables["num_uniqueness_cuts"]:]:
+        # Ensure at least 2 unique players compared to previous lineups
+        prev_indices = [player_vars[pid].Index() for pid in prev if pid in player_vars]
+        if prev_indices:
+            cut = model.Proto().constraints.add()
+            cut.linear.vars.extend(prev_indices)
+            cut.linear.coeffs.extend([1] * len(prev_indices))
+            cut.linear.domain.extend([0, 6])
+            if Config.UNIQUENESS_WINDOW:
+                # Windowed cuts are only enforced while their literal is assumed
+                active = model.NewBoolVar(f"unique_{len(uniqueness_literals)}")
+                cut.enforcement_literal.append(active.Index())
+                uniqueness_literals.append(active)
+    variables["num_uniqueness_cuts"] = len(used_lineups_sets)
+    
+    # Exposure bans come and go between attempts, so they are passed as assumptions.
+    # Counters are arrays indexed like teams, so every team is checked in one comparison
+    num_lineups = max(1, num_generated_lineups)
+    banned_primary = ((primary_stack_counts / num_lineups >= Config.MAX_PRIMARY_STACK_PCT) |
+                      (recent_primary_teams >= Config.RECENT_TEAMS_WINDOW))
+    banned_secondary = ((secondary_stack_counts / num_lineups >= Config.MAX_SECONDARY_STACK_PCT) |
+                        (recent_secondary_teams >= Config.RECENT_TEAMS_WINDOW))
+    banned = [is_primary_team[teams[i]].Not() for i in np.flatnonzero(banned_primary)]
+    banned += [is_secondary_team[teams[i]].Not() for i in np.flatnonzero(banned_secondary)]
+    
+    model.ClearAssumptions()
+    model.AddAssumptions(banned)
+    if Config.UNIQUENESS_WINDOW:
+        # Expired cuts keep a free literal, which presolve fixes to false and drops
+        model.AddAssumptions(uniqueness_literals[-Config.UNIQUENESS_WINDOW:])
+
 def add_stack_rules(model: cp_model.CpModel,
                    players: List[Player],
+                   owned_by_team: Dict[str, List[Player]],
                    player_vars: Dict[int, cp_model.IntVar],
                    is_primary_team: Dict[str, cp_model.IntVar],
                    is_secondary_team: Dict[str, cp_model.IntVar]) -> None:
@@ -378,24 +490,20 @@ def add_stack_rules(model: cp_model.CpModel,
     for rule in Config.AVOID_STACK_PITCHER_PAIRS:
         for p in players:
             if p.is_pitcher and p.id in player_vars:
-                pitcher_name = p.name.split(":")[-1].strip()
-                if pitcher_name in rule["pitchers"]:
+                if p.short_name in rule["pitchers"]:
                     pitcher_var = player_vars[p.id]
                     
                     # For each team in the stacks list
                     for stack_team in rule["stacks"]:
-                        # Get all batters from this team
-                        team_batters = [p for p in players if p.team == stack_team and not p.is_pitcher and p.id in player_vars]
-                        
-                        # Sort by ownership and get top 5
-                        top_5_owned = sorted(team_batters, key=lambda x: x.ownership, reverse=True)[:5]
+                        # Top 5 owned batters from this team
+                        top_5_owned = owned_by_team.get(stack_team, [])[:5]
                         
                         if len(top_5_owned) >= 3:  # Only apply rule if we have at least 3 players
                             # Create a variable that is true if 3 or more of the top 5 owned batters are used
                             high_owned_used = model.NewBoolVar(f"high_owned_used_{stack_team}")
                             
                             # Sum of top 5 owned batters in lineup
-                            top_5_sum = sum(player_vars[p.id] for p in top_5_owned)
+                            top_5_sum = cp_model.LinearExpr.Sum([player_vars[p.id] for p in top_5_owned])
                             
                             # Set high_owned_used to true if 3 or more are used
                             model.Add(top_5_sum >= 3).OnlyEnforceIf(high_owned_used)
@@ -408,7 +516,7 @@ def add_stack_rules(model: cp_model.CpModel,
     for rule in Config.REQUIRE_STACK_PITCHER_PAIRS:
         # Get the pitcher variables
         pitcher_vars = [player_vars[p.id] for p in players 
-                      if p.is_pitcher and p.name.split(":")[-1].strip() in rule["pitchers"] and p.id in player_vars]
+                      if p.is_pitcher and p.short_name in rule["pitchers"] and p.id in player_vars]
         
         if pitcher_vars:
             if not rule["secondary"]:  # If there's no secondary list
@@ -446,24 +554,48 @@ def add_stack_rules(model: cp_model.CpModel,
                                     *pitcher_vars
                                 ])
 
+def update_recent_teams(recent_teams: np.ndarray, team_index: int) -> None:
+    """Count up the team just used and decay every other team towards zero."""
+    used_count = recent_teams[team_index] + 1
+    np.maximum(recent_teams - 1, 0, out=recent_teams)
+    recent_teams[team_index] = used_count
+
 def create_optimized_solver() -> cp_model.CpSolver:
     """Create a highly optimized OR-Tools solver configuration for maximum performance."""
     solver = cp_model.CpSolver()
     
     # Core performance optimizations
     solver.parameters.log_search_progress = False  # Disable verbose logging
-    solver.parameters.num_search_workers = 8  # Use multiple workers for parallel search
+    solver.parameters.num_search_workers = Config.NUM_SEARCH_WORKERS
     
     # Time limit
-    solver.parameters.max_time_in_seconds = 30.0  # Set time limit
+    solver.parameters.max_time_in_seconds = Config.MAX_TIME_PER_LINEUP
     
     # Presolve and preprocessing optimizations
     solver.parameters.cp_model_presolve = True  # Enable presolve for better performance
-    solver.parameters.linearization_level = 2  # Aggressive linearization
-    solver.parameters.interleave_search = True  # Interleave different search strategies
+    solver.parameters.linearization_level = Config.LINEARIZATION_LEVEL
+    
+    # Optionally repair the previous lineup's hint where new cuts make it infeasible
+    solver.parameters.repair_hint = Config.REPAIR_HINT
+    solver.parameters.hint_conflict_limit = Config.HINT_CONFLICT_LIMIT
     
     return solver
 
+def add_solution_hint(model: cp_model.CpModel,
+                      solver: cp_model.CpSolver,
+                      variables: Dict) -> None:
+    """Hint the model with the last solution to warm-start the next attempt."""
+    model.ClearHints()
+    for var in variables["player_vars"].values():
+        model.AddHint(var, solver.Value(var))
+    for slots in variables["assign"].values():
+        for var in slots.values():
+            model.AddHint(var, solver.Value(var))
+    for var in variables["is_primary_team"].values():
+        model.AddHint(var, solver.Value(var))
+    for var in variables["is_secondary_team"].values():
+        model.AddHint(var, solver.Value(var))
+
 def solve_lineup(model: cp_model.CpModel,
                 players: List[Player],
                 teams: List[str],
@@ -477,10 +609,10 @@ def solve_lineup(model: cp_model.CpModel,
     # Handle different solver statuses with more detailed information
     if status == cp_model.OPTIMAL:
         print(f"✅ Optimal solution found in {solver.WallTime():.2f} seconds")
-        print(f"   Objective value: {solver.ObjectiveValue():.2f}")
+        print(f"   Objective value: {solver.ObjectiveValue() / 100:.2f}")
     elif status == cp_model.FEASIBLE:
         print(f"⚠️  Feasible solution found in {solver.WallTime():.2f} seconds")
-        print(f"   Objective value: {solver.ObjectiveValue():.2f}")
+        print(f"   Objective value: {solver.ObjectiveValue() / 100:.2f}")
     elif status == cp_model.INFEASIBLE:
         print("❌ Model is infeasible - no solution exists")
         return None
@@ -489,7 +621,7 @@ def solve_lineup(model: cp_model.CpModel,
         return None
     elif status == cp_model.UNKNOWN:
         print("⚠️  Solver status unknown - may have hit time limit")
-        if solver.WallTime() >= 30.0:
+        if solver.WallTime() >= Config.MAX_TIME_PER_LINEUP:
             print("   Time limit reached - consider increasing max_time_in_seconds")
         return None
     else:
@@ -503,23 +635,32 @@ def solve_lineup(model: cp_model.CpModel,
     print(f"     - Wall time: {solver.WallTime():.2f} seconds")
     print(f"     - User time: {solver.UserTime():.2f} seconds")
     
+    add_solution_hint(model, solver, variables)
+    
     lineup = []
     lineup_ids = set()
     primary_stack = ""
     secondary_stack = ""
     
     # Get primary and secondary stacks
+    is_primary_team = variables["is_primary_team"]
+    is_secondary_team = variables["is_secondary_team"]
     for team in teams:
-        if solver.Value(variables["is_primary_team"][team]):
+        if solver.BooleanValue(is_primary_team[team]):
             primary_stack = team
-        if solver.Value(variables["is_secondary_team"][team]):
+        if solver.BooleanValue(is_secondary_team[team]):
             secondary_stack = team
     
-    # Get players in lineup
-    for p in players:
-        if solver.Value(variables["player_vars"][p.id]):
-            assigned_slot = next((s for s in variables["assign"][p.id] 
-                                if solver.Value(variables["assign"][p.id][s])), None)
+    # Get players in lineup, reading slot values only for the nine selected players
+    player_vars = variables["player_vars"]
+    assign = variables["assign"]
+    for p in variables["valid_players"]:
+        if solver.BooleanValue(player_vars[p.id]):
+            assigned_slot = "UTIL"
+            for slot, slot_var in assign[p.id].items():
+                if solver.BooleanValue(slot_var):
+                    assigned_slot = slot
+                    break
             lineup.append({
                 "Slot": assigned_slot,
                 "Name": p.name,
@@ -582,46 +723,23 @@ def print_lineup(lineup: Lineup, lineup_num: int) -> None:
 
 def export_to_csv(lineups: List[Lineup], output_path: str) -> None:
     """Export lineups to a CSV file in FanDuel format."""
-    # FanDuel's position order
+    # FanDuel's position order: single slots have fixed columns, OF fills columns 5-7
     fd_position_order = ['P', 'C/1B', '2B', '3B', 'SS', 'OF', 'OF', 'OF', 'UTIL']
+    slot_columns = {'P': 0, 'C/1B': 1, '2B': 2, '3B': 3, 'SS': 4, 'UTIL': 8}
+    
+    # Assemble every row in one array and write it out in a single call
+    rows = np.empty((len(lineups), len(fd_position_order)), dtype=object)
+    for i, lineup in enumerate(lineups):
+        of_column = 5
+        for player in lineup.players:
+            if player["Slot"] == "OF":
+                rows[i, of_column] = player["Id"]
+                of_column += 1
+            else:
+                rows[i, slot_columns[player["Slot"]]] = player["Id"]
     
-    with open(output_path, 'w', newline='') as f:
-        writer = csv.writer(f)
-        # Write header
-        writer.writerow(['P', 'C/1B', '2B', '3B', 'SS', 'OF', 'OF', 'OF', 'UTIL'])
-        
-        # Write each lineup
-        for lineup in lineups:
-            # Create position map for this lineup
-            position_map = {}
-            outfielders = []
-            util_candidates = []
-            
-            for player in lineup.players:
-                if player["Slot"] == "OF":
-                    outfielders.append(player)
-                elif player["Slot"] == "UTIL":
-                    util_candidates.append(player)
-                else:
-                    position_map[player["Slot"]] = player
-            
-            # Build row in FanDuel's order
-            row = []
-            for pos in fd_position_order:
-                if pos == 'OF':
-                    if outfielders:
-                        player = outfielders.pop(0)
-                        row.append(player["Id"])
-                elif pos == 'UTIL':
-                    if util_candidates:
-                        player = util_candidates[0]
-                        row.append(player["Id"])
-                else:
-                    if pos in position_map:
-                        player = position_map[pos]
-                        row.append(player["Id"])
-            
-            writer.writerow(row)
+    np.savetxt(output_path, rows, fmt='%s', delimiter=',',
+               header=','.join(fd_position_order), comments='')
 
 def monitor_performance(solver: cp_model.CpSolver, attempt: int, total_lineups: int) -> None:
     """Monitor and report solver performance metrics."""
@@ -640,7 +758,8 @@ def main():
         # Load and process data
         df, ro8_9_ids = load_and_clean_data(Config.DATA_FILE)
         players = create_player_objects(df)
-        teams = list(set(p.team for p in players))
+        teams = list({p.team for p in players})
+        team_idx = {team: i for i, team in enumerate(teams)}
         
         # Validate that we have enough players for the model
         if len(players) < 9:
@@ -654,51 +773,45 @@ def main():
         # Initialize tracking variables
         generated_lineups = []
         used_lineups_sets = []
-        primary_stack_counts = {}
-        secondary_stack_counts = {}
-        pitcher_counts = {}
-        recent_primary_teams = {team: 0 for team in teams}
-        recent_secondary_teams = {team: 0 for team in teams}
-        stack_combinations = {}
-        stack_type_counts = {"4-3": 0, "4-4": 0}
+        primary_stack_counts = np.zeros(len(teams), dtype=np.int32)
+        secondary_stack_counts = np.zeros(len(teams), dtype=np.int32)
+        pitcher_counts = Counter({p.short_name: 0 for p in pitchers})
+        pitcher_by_id = {p.id: p for p in pitchers}
+        recent_primary_teams = np.zeros(len(teams), dtype=np.int32)
+        recent_secondary_teams = np.zeros(len(teams), dtype=np.int32)
+        stack_combinations = Counter()
+        stack_type_counts = Counter({"4-3": 0, "4-4": 0})
         attempt = 0
         
-        for player in players:
-            if player.is_pitcher:
-                pitcher_counts[player.name] = 0
+        # Build the invariant model once and reuse it for every attempt
+        groups = group_players(players)
+        model, variables = build_base_model(groups, teams, ro8_9_ids)
+        validate_model(model)
         
         # Generate lineups
         while (len(generated_lineups) < Config.NUM_LINEUPS_TO_GENERATE and 
                attempt < Config.MAX_ATTEMPTS):
             attempt += 1
-            model, variables = create_lineup_model(
-                players, teams, primary_stack_counts, secondary_stack_counts,
+            add_iteration_constraints(
+                model, variables, teams, primary_stack_counts, secondary_stack_counts,
                 recent_primary_teams, recent_secondary_teams, used_lineups_sets,
-                ro8_9_ids, len(generated_lineups)
+                len(generated_lineups)
             )
             lineup = solve_lineup(model, players, teams, variables)
             if not lineup:
                 continue
-            primary_stack_counts[lineup.primary_stack] = primary_stack_counts.get(lineup.primary_stack, 0) + 1
-            secondary_stack_counts[lineup.secondary_stack] = secondary_stack_counts.get(lineup.secondary_stack, 0) + 1
-            stack_key = f"{lineup.primary_stack}-{lineup.secondary_stack}"
-            stack_combinations[stack_key] = stack_combinations.get(stack_key, 0) + 1
+            primary_index = team_idx[lineup.primary_stack]
+            secondary_index = team_idx[lineup.secondary_stack]
+            primary_stack_counts[primary_index] += 1
+            secondary_stack_counts[secondary_index] += 1
+            stack_combinations[f"{lineup.primary_stack}-{lineup.secondary_stack}"] += 1
             secondary_stack_size = sum(1 for p in lineup.players if p["Team"] == lineup.secondary_stack and p["Slot"] != "P")
             stack_type = "4-4" if secondary_stack_size == 4 else "4-3"
             stack_type_counts[stack_type] += 1
-            for player in lineup.players:
-                if player["Slot"] == "P":
-                    pitcher_name = player["Name"].split(":")[-1].strip()
-                    pitcher_counts[pitcher_name] = pitcher_counts.get(pitcher_name, 0) + 1
-            for team in teams:
-                if team == lineup.primary_stack:
-                    recent_primary_teams[team] += 1
-                else:
-                    recent_primary_teams[team] = max(0, recent_primary_teams[team] - 1)
-                if team == lineup.secondary_stack:
-                    recent_secondary_teams[team] += 1
-                else:
-                    recent_secondary_teams[team] = max(0, recent_secondary_teams[team] - 1)
+            pitcher = pitcher_by_id[next(p["Id"] for p in lineup.players if p["Slot"] == "P")]
+            pitcher_counts[pitcher.short_name] += 1
+            update_recent_teams(recent_primary_teams, primary_index)
+            update_recent_teams(recent_secondary_teams, secondary_index)
             generated_lineups.append(lineup)
             used_lineups_sets.append(set(p["Id"] for p in lineup.players))
             print_lineup(lineup, len(generated_lineups))
@@ -721,6 +834,7 @@ class MLBOptimizer:
         self.config = config or Config()
         self.players = []
         self.teams = []
+        self.team_idx = {}
         self.ro8_9_ids = set()
         
     def load_data(self, data_file=None):
@@ -728,7 +842,8 @@ class MLBOptimizer:
         file_path = data_file or self.config.DATA_FILE
         df, self.ro8_9_ids = load_and_clean_data(file_path)
         self.players = create_player_objects(df)
-        self.teams = list(set(p.team for p in self.players))
+        self.teams = list({p.team for p in self.players})
+        self.team_idx = {team: i for i, team in enumerate(self.teams)}
         
         # Validate data
         if len(self.players) < 9:
@@ -751,39 +866,39 @@ class MLBOptimizer:
         # Initialize tracking variables
         generated_lineups = []
         used_lineups_sets = []
-        primary_stack_counts = {}
-        secondary_stack_counts = {}
-        recent_primary_teams = {team: 0 for team in self.teams}
-        recent_secondary_teams = {team: 0 for team in self.teams}
+        primary_stack_counts = np.zeros(len(self.teams), dtype=np.int32)
+        secondary_stack_counts = np.zeros(len(self.teams), dtype=np.int32)
+        recent_primary_teams = np.zeros(len(self.teams), dtype=np.int32)
+        recent_secondary_teams = np.zeros(len(self.teams), dtype=np.int32)
         attempt = 0
         
+        # Build the invariant model once and reuse it for every attempt
+        groups = group_players(self.players)
+        model, variables = build_base_model(groups, self.teams, self.ro8_9_ids)
+        validate_model(model)
+        
         # Generate lineups
         while (len(generated_lineups) < num_lineups and 
                attempt < max_attempts):
             attempt += 1
-            model, variables = create_lineup_model(
-                self.players, self.teams, primary_stack_counts, secondary_stack_counts,
+            add_iteration_constraints(
+                model, variables, self.teams, primary_stack_counts, secondary_stack_counts,
                 recent_primary_teams, recent_secondary_teams, used_lineups_sets,
-                self.ro8_9_ids, len(generated_lineups)
+                len(generated_lineups)
             )
             lineup = solve_lineup(model, self.players, self.teams, variables)
             if not lineup:
                 continue
                 
             # Update tracking
-            primary_stack_counts[lineup.primary_stack] = primary_stack_counts.get(lineup.primary_stack, 0) + 1
-            secondary_stack_counts[lineup.secondary_stack] = secondary_stack_counts.get(lineup.secondary_stack, 0) + 1
+            primary_index = self.team_idx[lineup.primary_stack]
+            secondary_index = self.team_idx[lineup.secondary_stack]
+            primary_stack_counts[primary_index] += 1
+            secondary_stack_counts[secondary_index] += 1
             
             # Update recent teams
-            for team in self.teams:
-                if team == lineup.primary_stack:
-                    recent_primary_teams[team] += 1
-                else:
-                    recent_primary_teams[team] = max(0, recent_primary_teams[team] - 1)
-                if team == lineup.secondary_stack:
-                    recent_secondary_teams[team] += 1
-                else:
-                    recent_secondary_teams[team] = max(0, recent_secondary_teams[team] - 1)
+            update_recent_teams(recent_primary_teams, primary_index)
+            update_recent_teams(recent_secondary_teams, secondary_index)
             
             generated_lineups.append(lineup)
             used_lineups_sets.append(set(p["Id"] for p in lineup.players))
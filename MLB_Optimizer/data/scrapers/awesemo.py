@@ -1,6 +1,8 @@
 import json
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 import os
 import sys
@@ -10,40 +12,61 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 from config.scraper_config import AWESEMO_SLATE_ID
+from data.scrapers.io_utils import write_csv, projection_cache_path, read_cached_frame, write_cached_frame
 
-pd.set_option('display.max_columns', None)
-pd.set_option('display.max_rows', None)
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Fall back to the standard library parser
+
+# Shared HTTP session so repeated requests reuse pooled keep-alive connections
+_SESSION = requests.Session()
+_SESSION.headers.update({'Accept-Encoding': 'gzip, deflate'})
+_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                       max_retries=Retry(total=2, backoff_factor=0.3)))
+
+# Fields used by process_projections; everything else in the payload is dropped
+AWESEMO_COLUMNS = [
+    'nameAndId', 'ownership', 'name', 'salary', 'lineupPosition',
+    'position', 'team', 'opponent', 'projection', 'confirmedLineup'
+]
 
 class AwesemoProjectionScraper:
-    def __init__(self, slate_id=None):
+    def __init__(self, slate_id=None, use_cache=True):
         """
         Initialize the Awesemo projection scraper.
         
         Args:
             slate_id (int): The slate ID to scrape. If None, uses default from daily_config.
+            use_cache (bool): Reuse processed projections cached for this slate in the current hour.
         """
         self.slate_id = slate_id or AWESEMO_SLATE_ID
+        self.use_cache = use_cache
         self.base_url = 'https://app-api-dfs-prod-main.azurewebsites.net/api/slatedata/projections'
         
-    def get_projections(self):
-        """Fetch projections from Awesemo API."""
+    def fetch_records(self):
+        """Fetch the raw projection records from Awesemo API."""
         try:
             url = f'{self.base_url}?SlateId={self.slate_id}'
             
-            response = requests.get(url, timeout=30)
+            response = _SESSION.get(url, timeout=30)
             response.raise_for_status()
             
-            data = json.loads(response.text)
-            df = pd.DataFrame(data)
-            
-            return df
+            # Parse the raw bytes rather than the decoded text
+            return orjson.loads(response.content) if orjson else json.loads(response.content)
             
         except requests.exceptions.RequestException as e:
             print(f"Error fetching data from Awesemo API: {e}")
-            return pd.DataFrame()
+            return []
         except json.JSONDecodeError as e:
             print(f"Error parsing JSON response: {e}")
-            return pd.DataFrame()
+            return []
+    
+    def get_projections(self):
+        """Fetch projections from Awesemo API."""
+        try:
+            # Only build the columns we use
+            return pd.DataFrame.from_records(self.fetch_records(), columns=AWESEMO_COLUMNS)
         except Exception as e:
             print(f"Unexpected error: {e}")
             return pd.DataFrame()
@@ -54,36 +77,37 @@ class AwesemoProjectionScraper:
             return pd.DataFrame()
         
         try:
-            # Extract DFS ID from nameAndId
-            df['DFS ID'] = df['nameAndId'].str.split(':').str[0]
-            
-            # Convert ownership to percentage
-            df['pOWN'] = df['ownership'] * 100
-            
-            # Select and rename columns for standardization
-            processed_df = df[[
-                'DFS ID', 'name', 'salary', 'lineupPosition', 
-                'position', 'team', 'opponent', 'projection', 
-                'pOWN', 'confirmedLineup'
-            ]].copy()
-            
-            # Fill NaN values
-            processed_df = processed_df.fillna(0)
-            
-            # Filter out projections below threshold
-            processed_df = processed_df[processed_df['projection'] > 1]
-            
-            # Add source identifier
-            processed_df['projection_source'] = 'Awesemo'
-            
-            # Rename columns to match our standard format
-            processed_df = processed_df.rename(columns={
-                'name': 'player_name',
-                'projection': 'awesemo_projection',
-                'pOWN': 'awesemo_ownership'
-            })
+            # Build the standardized frame in one chain: filter out projections below
+            # threshold first (NaN projections fail too) so the derived columns are only
+            # built for the kept rows, then select, fill, tag and rename
+            processed_df = (
+                df.loc[df['projection'] > 1]
+                .assign(**{
+                    # Extract DFS ID from nameAndId (only the first colon matters)
+                    'DFS ID': lambda d: d['nameAndId'].str.split(':', n=1).str[0],
+                    # Convert ownership to percentage
+                    'pOWN': lambda d: d['ownership'] * 100
+                })
+                [[
+                    'DFS ID', 'name', 'salary', 'lineupPosition',
+                    'position', 'team', 'opponent', 'projection',
+                    'pOWN', 'confirmedLineup'
+                ]]
+                .fillna(0)
+                .assign(projection_source='Awesemo')
+                .rename(columns={
+                    'name': 'player_name',
+                    'projection': 'awesemo_projection',
+                    'pOWN': 'awesemo_ownership'
+                })
+            )
             # Keep DFS ID as is for consistent matching
             
+            # Low-cardinality labels compare and group faster as categories
+            for col in ('team', 'opponent', 'position', 'projection_source'):
+                if col in processed_df.columns:
+                    processed_df[col] = processed_df[col].astype('category')
+            
             print(f"Processed {len(processed_df)} valid projections")
             return processed_df
             
@@ -102,7 +126,7 @@ class AwesemoProjectionScraper:
             output_path = f'/Users/adamsardinha/Desktop/Awesemo_MLB_FD_{timestamp}.csv'
         
         try:
-            df.to_csv(output_path, index=False)
+            write_csv(df, output_path)
             print(f"Projections saved to: {output_path}")
             return output_path
         except Exception as e:
@@ -112,15 +136,23 @@ class AwesemoProjectionScraper:
     def run(self, output_path=None):
         """Run the complete scraping process."""
         
-        # Fetch projections
-        raw_df = self.get_projections()
-        if raw_df.empty:
-            return None
+        # Reuse this hour's processed projections for the slate if we have them
+        cache_path = projection_cache_path('awesemo', self.slate_id)
+        processed_df = read_cached_frame(cache_path) if self.use_cache else None
         
-        # Process projections
-        processed_df = self.process_projections(raw_df)
-        if processed_df.empty:
-            return None
+        if processed_df is None:
+            # Fetch projections
+            raw_df = self.get_projections()
+            if raw_df.empty:
+                return None
+            
+            # Process projections
+            processed_df = self.process_projections(raw_df)
+            if processed_df.empty:
+                return None
+            
+            if self.use_cache:
+                write_cached_frame(processed_df, cache_path)
         
         # Optionally save to file if output_path is provided
         if output_path:
@@ -129,8 +161,29 @@ class AwesemoProjectionScraper:
         else:
             return processed_df
 
+    def run_stream(self, chunksize=5000):
+        """Yield processed projections in chunks of the payload so consumers can start early."""
+        try:
+            records = self.fetch_records()
+        except Exception as e:
+            print(f"Unexpected error: {e}")
+            return
+        
+        for start in range(0, len(records), chunksize):
+            chunk = records[start:start + chunksize]
+            # Keep payload positions as the index so chunks line up with a full run
+            raw_df = pd.DataFrame.from_records(chunk, columns=AWESEMO_COLUMNS,
+                                               index=pd.RangeIndex(start, start + len(chunk)))
+            processed_df = self.process_projections(raw_df)
+            if not processed_df.empty:
+                yield processed_df
+
 def main():
     """Main function to run the scraper."""
+    # Full frame display is only useful when running the scraper by hand
+    pd.set_option('display.max_columns', None)
+    pd.set_option('display.max_rows', None)
+    
     scraper = AwesemoProjectionScraper()
     output_path = scraper.run()
     
@@ -0,0 +1,58 @@
+"""
+Shared file I/O helpers for the projection scrapers
+"""
+
+import os
+import tempfile
+from datetime import datetime, timezone
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None  # Fall back to pandas.to_csv and skip the parquet cache
+
+
+def write_csv(df: pd.DataFrame, output_path):
+    """Write a DataFrame to CSV without the index, using Arrow's writer when available."""
+    if pa is not None:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            pacsv.write_csv(table, output_path)
+            return
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            # Mixed-type or nested object columns can't go through Arrow
+            pass
+    df.to_csv(output_path, index=False)
+
+
+def projection_cache_path(source: str, key) -> str:
+    """Parquet cache path for a scraper's processed frame, rotated every UTC hour."""
+    hour = datetime.now(timezone.utc).strftime('%Y%m%d_%H')
+    return os.path.join(tempfile.gettempdir(), f'mlb_{source}_{key}_{hour}.parquet')
+
+
+def read_cached_frame(cache_path: str):
+    """Return the cached frame, or None on a miss or when pyarrow is unavailable."""
+    if pa is None or not os.path.exists(cache_path):
+        return None
+    try:
+        return pd.read_parquet(cache_path)
+    except (OSError, pa.ArrowException):
+        return None
+
+
+def write_cached_frame(df: pd.DataFrame, cache_path: str):
+    """Persist a processed frame for later runs; frames Arrow can't store are not cached."""
+    if pa is None:
+        return
+    # Write to a temporary file first so a concurrent reader never sees a partial file
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        df.to_parquet(tmp_path, compression='zstd')
+        os.replace(tmp_path, cache_path)
+    except (OSError, ValueError, pa.ArrowException):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
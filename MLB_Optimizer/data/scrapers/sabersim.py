@@ -10,6 +10,16 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 from config.scraper_config import SABERSIM_CSV_PATH
+from data.scrapers.io_utils import write_csv
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None  # Fall back to pandas CSV parsing
+
+# Columns read from the SaberSim export (H is optional)
+SABERSIM_COLUMNS = ['DFS ID', 'Name', 'Pos', 'Order', 'Team', 'Opp', 'fd_points', 'fd_25_percentile', 'fd_85_percentile', 'H']
 
 class SaberSimProjectionScraper:
     """
@@ -20,11 +30,14 @@ class SaberSimProjectionScraper:
     - Order: Roster Order for batters
     - fd_25_percentile: Projection floor
     - fd_85_percentile: Projection ceiling
+    
+    Set verbose=True to print the projection summary and a sample of rows.
     """
     
-    def __init__(self, csv_path: str = None):
+    def __init__(self, csv_path: str = None, verbose: bool = False):
         self.csv_path = csv_path or SABERSIM_CSV_PATH
         self.source_name = "SaberSim"
+        self.verbose = verbose
         
     def run(self, output_path: Optional[str] = None) -> pd.DataFrame:
         """
@@ -45,7 +58,9 @@ class SaberSimProjectionScraper:
                 return pd.DataFrame()
             
             print(f"Loading projections from: {self.csv_path}")
-            df = pd.read_csv(self.csv_path)
+            df = self._read_csv() if pa is not None else None
+            if df is None:
+                df = pd.read_csv(self.csv_path)
             
             print(f"Loaded {len(df)} projections from {self.source_name}")
             
@@ -58,7 +73,7 @@ class SaberSimProjectionScraper:
             
             # Save to file if requested
             if output_path:
-                processed_df.to_csv(output_path, index=False)
+                write_csv(processed_df, output_path)
                 print(f"✅ Saved {self.source_name} projections to {output_path}")
             else:
                 print(f"✅ Successfully scraped {self.source_name} projections (no file saved)")
@@ -69,6 +84,49 @@ class SaberSimProjectionScraper:
             print(f"❌ Error scraping {self.source_name} projections: {e}")
             return pd.DataFrame()
     
+    def run_stream(self, chunksize: int = 5000):
+        """
+        Yield processed SaberSim projections one CSV chunk at a time.
+        
+        Args:
+            chunksize: Number of CSV rows parsed per chunk
+            
+        Yields:
+            DataFrames with processed projections (empty chunks are skipped)
+        """
+        if not os.path.exists(self.csv_path):
+            print(f"❌ Error: CSV file not found at {self.csv_path}")
+            return
+        
+        reader = pd.read_csv(self.csv_path, chunksize=chunksize, usecols=lambda col: col in SABERSIM_COLUMNS)
+        for chunk in reader:
+            processed_df = self._process_projections(chunk)
+            if not processed_df.empty:
+                yield processed_df
+    
+    def _read_csv(self) -> Optional[pd.DataFrame]:
+        """Read only the SaberSim columns we use with pyarrow's typed reader.
+        
+        Returns None if a column is missing or a numeric column holds text, so
+        the caller can fall back to pandas' parser.
+        """
+        convert_options = pacsv.ConvertOptions(
+            include_columns=SABERSIM_COLUMNS,
+            column_types={
+                'DFS ID': pa.string(),
+                'Order': pa.float64(),
+                'fd_points': pa.float64(),
+                'fd_25_percentile': pa.float64(),
+                'fd_85_percentile': pa.float64(),
+                'H': pa.float64()
+            },
+            strings_can_be_null=True
+        )
+        try:
+            return pacsv.read_csv(self.csv_path, convert_options=convert_options).to_pandas()
+        except (pa.ArrowInvalid, KeyError):
+            return None
+    
     def _process_projections(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Process raw CSV data into standardized projection format.
@@ -83,74 +141,47 @@ class SaberSimProjectionScraper:
         
         # Required columns
         required_cols = ['DFS ID', 'Name', 'Pos', 'Order', 'Team', 'Opp', 'fd_points', 'fd_25_percentile', 'fd_85_percentile']
-        missing_cols = [col for col in required_cols if col not in df.columns]
+        cols_present = set(df.columns)
+        missing_cols = [col for col in required_cols if col not in cols_present]
         
         if missing_cols:
             print(f"❌ Missing required columns: {missing_cols}")
             return pd.DataFrame()
         
-        # Create processed DataFrame
-        processed_data = []
-        
-        for _, row in df.iterrows():
-            try:
-                # Extract basic info
-                dfs_id = str(row['DFS ID']).strip()
-                name = str(row['Name']).strip()
-                position = str(row['Pos']).strip()
-                team = str(row['Team']).strip()
-                opponent = str(row['Opp']).strip()
-                
-                # Extract roster order (for batters only)
-                roster_order = row.get('Order', 0)
-                if pd.isna(roster_order) or roster_order == '':
-                    roster_order = 0
-                else:
-                    roster_order = int(roster_order)
-                
-                # Extract projections - use fd_points as primary projection
-                fd_points = row.get('fd_points', 0)
-                floor_proj = row.get('fd_25_percentile', 0)
-                ceiling_proj = row.get('fd_85_percentile', 0)
-                hits_proj = row.get('H', 0)  # Extract hits projection
-                
-                # Use fd_points as the main projection
-                if pd.notna(fd_points) and float(fd_points) > 0:
-                    main_projection = float(fd_points)
-                else:
-                    main_projection = 0
-                
-                # Only include players with valid projections
-                if main_projection > 0:
-                    processed_data.append({
-                        'DFS ID': dfs_id,
-                        'player_name': name,
-                        'position': position,
-                        'team': team,
-                        'opponent': opponent,
-                        'roster_order': roster_order,
-                        'floor_projection': float(floor_proj) if pd.notna(floor_proj) else 0,
-                        'ceiling_projection': float(ceiling_proj) if pd.notna(ceiling_proj) else 0,
-                        'sabersim_projection': main_projection,
-                        'hits_projection': float(hits_proj) if pd.notna(hits_proj) else 0
-                    })
-            
-            except Exception as e:
-                print(f"Warning: Error processing row for {row.get('Name', 'Unknown')}: {e}")
-                continue
+        # Use fd_points as the main projection and only keep players with valid
+        # projections; mask the raw rows first so the cleanup below only touches them
+        main_proj = pd.to_numeric(df['fd_points'], errors='coerce').fillna(0.0)
+        keep = (main_proj > 0).to_numpy()
+        rows = df.loc[keep, [col for col in SABERSIM_COLUMNS if col in cols_present]].reset_index(drop=True)
+        
+        # Process whole columns at once instead of row by row
+        result_df = pd.DataFrame({
+            'DFS ID': rows['DFS ID'].map(str).str.strip(),
+            'player_name': rows['Name'].map(str).str.strip(),
+            'position': rows['Pos'].map(str).str.strip(),
+            'team': rows['Team'].map(str).str.strip(),
+            'opponent': rows['Opp'].map(str).str.strip(),
+            # Roster order is only set for batters (0-9, so int16 is plenty)
+            'roster_order': pd.to_numeric(rows['Order'], errors='coerce').fillna(0).astype('int16'),
+            'floor_projection': pd.to_numeric(rows['fd_25_percentile'], errors='coerce').fillna(0.0),
+            'ceiling_projection': pd.to_numeric(rows['fd_85_percentile'], errors='coerce').fillna(0.0),
+            'sabersim_projection': main_proj.to_numpy()[keep],
+            'hits_projection': pd.to_numeric(rows['H'], errors='coerce').fillna(0.0) if 'H' in cols_present else 0.0
+        })
         
-        if not processed_data:
+        if result_df.empty:
             print("❌ No valid projections found after processing")
             return pd.DataFrame()
         
-        # Create DataFrame
-        result_df = pd.DataFrame(processed_data)
+        # Low-cardinality labels compare and group faster as categories
+        for col in ('team', 'opponent', 'position'):
+            result_df[col] = result_df[col].astype('category')
         
         # Print summary
         print(f"Processed {len(result_df)} valid projections from {self.source_name}")
         
-        # Calculate projection statistics
-        if 'sabersim_projection' in result_df.columns:
+        # Calculate projection statistics (skipped in pipeline runs)
+        if self.verbose:
             projections = result_df['sabersim_projection']
             print(f"\n{self.source_name} Projection Summary:")
             print(f"Total projections: {len(projections)}")
@@ -167,7 +198,7 @@ class SaberSimProjectionScraper:
 
 def main():
     """Main function for testing the scraper."""
-    scraper = SaberSimProjectionScraper()
+    scraper = SaberSimProjectionScraper(verbose=True)
     result = scraper.run()
     
     if not result.empty:
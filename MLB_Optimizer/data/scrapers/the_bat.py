@@ -1,5 +1,10 @@
+import hashlib
+import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import os
 import sys
@@ -9,31 +14,63 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 from config.scraper_config import THE_BAT_SIMALBS_URL, THE_BAT_PROJECTION_URL
+from data.scrapers.io_utils import write_csv, projection_cache_path, read_cached_frame, write_cached_frame
 
-pd.set_option('display.max_columns', None)
-pd.set_option('display.max_rows', None)
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Fall back to the standard library parser
+
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None  # Fall back to an uncached session
+
+# Shared HTTP session so repeated requests reuse pooled keep-alive connections.
+# With requests-cache installed, payloads are also cached on disk and revalidated
+# with ETag/Last-Modified, so an unchanged slate only costs a 304 round trip.
+if requests_cache is not None:
+    _SESSION = requests_cache.CachedSession(
+        os.path.expanduser('~/.cache/mlb_scrapes'),
+        backend='sqlite',
+        expire_after=300,
+        cache_control=True
+    )
+else:
+    _SESSION = requests.Session()
+_SESSION.headers.update({'Accept-Encoding': 'gzip, deflate'})
+_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                       max_retries=Retry(total=2, backoff_factor=0.3)))
 
 class TheBatProjectionScraper:
-    def __init__(self, simalbs_url=None, proj_url=None):
+    def __init__(self, simalbs_url=None, proj_url=None, use_cache=True):
         """
         Initialize The Bat projection scraper.
         
         Args:
             simalbs_url: URL for SimLabs player data. If None, uses default from daily_config.
             proj_url: URL for RotoGrinders projections. If None, uses default from daily_config.
+            use_cache: Reuse processed projections cached for these URLs in the current hour.
         """
         self.simalbs_url = simalbs_url or THE_BAT_SIMALBS_URL
         self.proj_url = proj_url or THE_BAT_PROJECTION_URL
+        self.use_cache = use_cache
+        # FantasyResultId -> row position in the last processed frame (use with .iloc)
+        self.fr_index = {}
         
     def fetch_json(self, url: str) -> list:
         """Fetches JSON data from the given URL and returns it as a Python list."""
         try:
-            resp = requests.get(url, timeout=30)
+            resp = _SESSION.get(url, timeout=30)
             resp.raise_for_status()
-            return resp.json()
+            # Parse the raw bytes rather than the decoded text
+            return orjson.loads(resp.content) if orjson else json.loads(resp.content)
         except requests.RequestException as e:
             print(f"Error fetching {url}: {e}")
             return []
+        except json.JSONDecodeError as e:
+            print(f"Error parsing JSON from {url}: {e}")
+            return []
     
     def load_player_data(self) -> pd.DataFrame:
         """Loads the SimLabs MLB JSON (player data) and returns a DataFrame."""
@@ -42,7 +79,7 @@ class TheBatProjectionScraper:
         if not data:
             return pd.DataFrame()
         
-        df = pd.DataFrame(data)
+        df = pd.DataFrame.from_records(data)
         print(f"Loaded {len(df)} players from SimLabs")
         return df
     
@@ -53,14 +90,18 @@ class TheBatProjectionScraper:
         if not data:
             return pd.DataFrame()
         
-        df = pd.DataFrame(data)
+        df = self.build_projection_frame(data)
+        print(f"Loaded {len(df)} projections from RotoGrinders")
+        return df
+    
+    def build_projection_frame(self, data: list) -> pd.DataFrame:
+        """Builds the projection DataFrame from RotoGrinders records."""
+        df = pd.DataFrame.from_records(data)
         # Rename "id" → "FantasyResultId"
         df = df.rename(columns={"id": "FantasyResultId"})
         # Drop the nested "ownership" column (or keep it if you want to inspect ownership details)
         if "ownership" in df.columns:
             df = df.drop(columns=["ownership"])
-        
-        print(f"Loaded {len(df)} projections from RotoGrinders")
         return df
     
     def merge_data(self, df_players: pd.DataFrame, df_proj: pd.DataFrame) -> pd.DataFrame:
@@ -69,14 +110,14 @@ class TheBatProjectionScraper:
             print("Cannot merge: one or both DataFrames are empty")
             return pd.DataFrame()
         
-        # Merge on FantasyResultId
-        merged = pd.merge(
-            df_players,
-            df_proj,
+        # Join projections on their FantasyResultId index (only rows present in both)
+        merged = df_players.join(
+            df_proj.set_index("FantasyResultId"),
             on="FantasyResultId",
-            how="inner",     # only rows present in both
-            suffixes=("_player", "_proj")
-        )
+            how="inner",
+            lsuffix="_player",
+            rsuffix="_proj"
+        ).reset_index(drop=True)
         
         print(f"Merged {len(merged)} players with projections")
         return merged
@@ -87,13 +128,6 @@ class TheBatProjectionScraper:
             return pd.DataFrame()
         
         try:
-            # Select and rename columns for standardization
-            # We'll need to map the columns based on what's available
-            processed_df = df.copy()
-            
-            # Add source identifier
-            processed_df['projection_source'] = 'TheBat'
-            
             # Rename columns to match our standard format
             column_mapping = {
                 'PlayerName': 'player_name',
@@ -105,10 +139,18 @@ class TheBatProjectionScraper:
                 'SourceContestGroupPlayerId': 'DFS ID'
             }
             
-            # Apply column mapping for columns that exist
-            for old_col, new_col in column_mapping.items():
-                if old_col in processed_df.columns:
-                    processed_df[new_col] = processed_df[old_col]
+            # Filter out projections below threshold before building the output frame
+            if 'proj' in df.columns:
+                df = df.loc[df['proj'] > 1]
+            
+            # Add the source identifier and the standard-named copies of the columns
+            # that exist in a single concat instead of one insert per column
+            present = {old_col: new_col for old_col, new_col in column_mapping.items() if old_col in df.columns}
+            renamed = df[list(present)].rename(columns=present)
+            processed_df = pd.concat(
+                [df.drop(columns=renamed.columns, errors='ignore').assign(projection_source='TheBat'), renamed],
+                axis=1
+            )
             
             # Ensure we have the required columns
             required_columns = ['player_name', 'position', 'team', 'the_bat_projection']
@@ -119,11 +161,16 @@ class TheBatProjectionScraper:
                 print(f"Available columns: {processed_df.columns.tolist()}")
                 return pd.DataFrame()
             
-            # Filter out projections below threshold
-            processed_df = processed_df[processed_df['the_bat_projection'] > 1]
+            # Low-cardinality labels compare and group faster as categories
+            for col in ('team', 'opponent', 'position', 'projection_source'):
+                if col in processed_df.columns:
+                    processed_df[col] = processed_df[col].astype('category')
             
             # No ownership processing needed - using Awesemo ownership as source of truth
             
+            # Index rows by FantasyResultId so lookups don't need a boolean mask
+            self.fr_index = {fid: i for i, fid in enumerate(processed_df['FantasyResultId'].to_numpy())}
+            
             print(f"Processed {len(processed_df)} valid projections from The Bat")
             return processed_df
             
@@ -142,7 +189,7 @@ class TheBatProjectionScraper:
             output_path = f'/Users/adamsardinha/Desktop/TheBat_MLB_FD_{timestamp}.csv'
         
         try:
-            df.to_csv(output_path, index=False)
+            write_csv(df, output_path)
             print(f"Projections saved to: {output_path}")
             return output_path
         except Exception as e:
@@ -153,25 +200,36 @@ class TheBatProjectionScraper:
         """Run the complete scraping process."""
         print(f"Starting The Bat projection scrape")
         
-        # Load player data
-        df_players = self.load_player_data()
-        if df_players.empty:
-            return None
-        
-        # Load projection data
-        df_proj = self.load_projection_data()
-        if df_proj.empty:
-            return None
-        
-        # Merge data
-        merged_df = self.merge_data(df_players, df_proj)
-        if merged_df.empty:
-            return None
+        # Reuse this hour's processed projections for these URLs if we have them
+        url_key = hashlib.md5(f"{self.simalbs_url}|{self.proj_url}".encode()).hexdigest()[:12]
+        cache_path = projection_cache_path('thebat', url_key)
+        processed_df = read_cached_frame(cache_path) if self.use_cache else None
         
-        # Process projections
-        processed_df = self.process_projections(merged_df)
-        if processed_df.empty:
-            return None
+        if processed_df is not None:
+            self.fr_index = {fid: i for i, fid in enumerate(processed_df['FantasyResultId'].to_numpy())}
+        else:
+            # Load player and projection data concurrently (both are independent HTTP calls)
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                players_future = executor.submit(self.load_player_data)
+                proj_future = executor.submit(self.load_projection_data)
+                df_players = players_future.result()
+                df_proj = proj_future.result()
+            
+            if df_players.empty or df_proj.empty:
+                return None
+            
+            # Merge data
+            merged_df = self.merge_data(df_players, df_proj)
+            if merged_df.empty:
+                return None
+            
+            # Process projections
+            processed_df = self.process_projections(merged_df)
+            if processed_df.empty:
+                return None
+            
+            if self.use_cache:
+                write_cached_frame(processed_df, cache_path)
         
         # Print summary
         print(f"\nThe Bat Projection Summary:")
@@ -188,8 +246,36 @@ class TheBatProjectionScraper:
             print("✅ Successfully scraped The Bat projections (no file saved)")
             return processed_df
 
+    def run_stream(self, chunksize=5000):
+        """Yield processed projections per chunk of the RotoGrinders payload.
+        
+        The SimLabs player table is needed in full for the join, so only the
+        projection records are chunked.
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            players_future = executor.submit(self.load_player_data)
+            proj_future = executor.submit(self.fetch_json, self.proj_url)
+            df_players = players_future.result()
+            records = proj_future.result()
+        
+        if df_players.empty:
+            return
+        
+        for start in range(0, len(records), chunksize):
+            df_proj = self.build_projection_frame(records[start:start + chunksize])
+            merged_df = self.merge_data(df_players, df_proj)
+            if merged_df.empty:
+                continue
+            processed_df = self.process_projections(merged_df)
+            if not processed_df.empty:
+                yield processed_df
+
 def main():
     """Main function to run the scraper."""
+    # Full frame display is only useful when running the scraper by hand
+    pd.set_option('display.max_columns', None)
+    pd.set_option('display.max_rows', None)
+    
     scraper = TheBatProjectionScraper()
     result = scraper.run()
     
@@ -10,6 +10,7 @@ setup(
         'pandas',
         'ortools',
         'numpy',
-        'requests'
+        'requests',
+        'packaging'
     ]
 )
\ No newline at end of file